@@ -14,4 +14,5 @@ if __name__ == "__main__":
   Logger.log(LOG_HEADER, "Opened app.")
   app = App()
   app.mainloop()
+  ElementDetector.uninit()
   Logger.log(LOG_HEADER, "Closed app.")
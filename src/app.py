@@ -1,14 +1,17 @@
 import os
 import time
-import random
-import threading
 import tkinter as tk
 from tkinter import ttk
 
 from src.logger import Logger
 from src.auto_gui import AutoGui
+from src.event_bus import EventBus
+from src.farm_engine import FarmEngine
+from src.farm_rules import FarmRule, RuleSet
 from src.window_manager import WindowManager
-from src.element_detector import ElementDetector
+from src.session_store import SessionStore
+from src.flight_recorder import FlightRecorder
+from src.sampling_profiler import SamplingProfiler
 
 
 class App(tk.Tk):
@@ -30,156 +33,26 @@ class App(tk.Tk):
 
   _LOG_HEADER: str = "App"
   _TARGET_EXE = "Discord.exe" # NOTE: Change this if you changed Discord's executable filename
+  _RULES_FILE = "rules.json" # Optional list of FarmRule entries, replaces the Player Name field when present
 
-  # Bounds for Discord
-  _FARM_BUTTON_TEXT = "farm"
-  _DISCORD_COMMAND_TEXT = "used /"
-  _CROP_LEFT = 0.15 # How much of the image to crop off the left side
-  _CROP_RIGHT = 1.0 - (0.20) # How much of the image to crop off the right side | NOTE: Change the parentheses value.
-  _CROP_TOP = 0.1 # How much of the image to crop off the top side
-  _CROP_BOTTOM = 1.0 - (0.1) # How much of the image to crop off the bottom side | NOTE: Change the parentheses value.
-  _MAX_VERTICAL_GAP = 500 # px
+  # Flight recorder
+  _RECORDER_DIR = "flight_records"
+  _RECORDER_MAX_BYTES = 64 * 1024 * 1024 # Memory budget for buffered frames
+  _RECORDER_DUMP_KEY = "<F8>" # Manually dump the recorder
 
-  # ================ Private Functions ================
-
-  def _threadedFarm(self):
-    """
-    Background farming loop with fixed-rate scheduling
-    """
-
-    self.is_processing = True
-    self.stop_event.clear()
-    try:
-      interval = random.uniform(self.lower_bound, self.upper_bound)
-      next_time = time.time()
-      Logger.log(App._LOG_HEADER, f"First run scheduled in {interval:.2f}s")
-
-      while self.running:
-        now = time.time()
-        sleep_time = next_time - now
-
-        # Wait, but can be interrupted
-        if sleep_time > 0:
-          self.stop_event.wait(timeout=sleep_time)
-        
-        # Stop immediately if requested
-        if not self.running or self.stop_event.is_set():
-          break
-
-        start = time.time()
-        clicked = self._autoFarm()
-        end = time.time()
-
-        runtime = end - start
-
-        # Schedule next run
-        interval = random.uniform(self.lower_bound, self.upper_bound)
-        next_time += interval
-
-        # Catch up if OCR ran long
-        if next_time < time.time():
-          Logger.log(App._LOG_HEADER, f"OCR overran interval (runtime={runtime:.2f}s), rescheduling")
-          next_time = time.time() + interval
-
-        delay = max(0.0, next_time - time.time())
-        Logger.log(App._LOG_HEADER, f"Cycle done | Clicked={clicked} | Runtime={runtime:.2f}s | Next run in {delay:.2f}s")
-
-    finally:
-      self.is_processing = False
-      Logger.log(App._LOG_HEADER, "Thread exited cleanly")
-  
+  # Session history & learned state
+  _SESSION_DB = "session.db"
+  _CLOSE_TIMEOUT = 5.0 # s to wait for the farm thread on close
 
-  def _autoFarm(self) -> bool:
-    """
-    Autoclicks the Farm button with the given parameters
-
-    :return: Success status of the click?
-    :type: bool
-    """
+  # Sampling profiler
+  _PROFILER_ENABLED = False # NOTE: Set to True to write flamegraph stacks of slow cycles
+  _PROFILER_DIR = "profiles"
+  _PROFILER_THRESHOLD = 2.0 # s, cycles slower than this (or overrunning their slot) are written out
 
-    # Check if function should run
-    if not self.found: return False
-
-    # Get discord texture & find text
-    screenshot = self.window_manager.getWindowTextureFromHwnd(self.target_hwnd)
-    img_height, img_width = screenshot.shape[:2]
-
-    # ---- Crop bounds ----
-    left   = int(img_width * App._CROP_LEFT)
-    right  = int(img_width * App._CROP_RIGHT)
-    top    = int(img_height * App._CROP_TOP)       # New: crop top
-    bottom = int(img_height * App._CROP_BOTTOM)    # New: crop bottom
-
-    # Crop the screenshot
-    cropped_screenshot = screenshot[top:bottom, left:right]
-
-    # Run OCR on cropped image
-    all_text = ElementDetector.detectText(cropped_screenshot)
-    if not all_text: return False
-
-    # Leave function if stop button was pressed
-    if not self.is_processing: return False
-
-    # Shift boxes back to original screenshot coordinates
-    chat_elements = []
-    for text, box in all_text:
-      x_min, y_min, x_max, y_max = box
-      shifted_box = (x_min + left, y_min + top, x_max + left, y_max + top)
-      chat_elements.append((text, shifted_box))
-
-
-    # Search bottom-up for the most recent message in the chat
-    sorted_elements = sorted(chat_elements, key=lambda x: x[1][1])
-    for i in range(len(sorted_elements) - 1, -1, -1):
-      text, box = sorted_elements[i]
-      clean_text = text.lower()
-      
-      # Avoid headers: Look for the name inside the embed
-      if self.target_player not in clean_text or App._DISCORD_COMMAND_TEXT in clean_text:
-        continue
-
-      player_y_top = box[1]
-      player_x_center = (box[0] + box[2]) / 2
-      
-      # Look DOWN for the button
-      for j in range(i + 1, len(sorted_elements)):
-        btn_text, btn_box = sorted_elements[j]
-        btn_clean = btn_text.lower().strip()
-
-        # Stop if we leave the embed area
-        if (btn_box[1] - player_y_top) > App._MAX_VERTICAL_GAP:
-          break
-        
-        # Ensure the button is the right text
-        if btn_clean != App._FARM_BUTTON_TEXT:
-          continue
-
-        # Only click if button is horizontally aligned with the name
-        btn_x_center = (btn_box[0] + btn_box[2]) / 2
-        if abs(btn_x_center - player_x_center) < 200:
-          # Define the button's click area (inner 60% of the button to be safe)
-          half_width = (btn_box[2] - btn_box[0]) * 0.3
-          half_height = (btn_box[3] - btn_box[1]) * 0.3
-
-          # Add random jitter so we don't click the same pixel twice
-          jitter_x = random.uniform(-half_width, half_width)
-          jitter_y = random.uniform(-half_height, half_height)
-
-          click_target = (
-            int(btn_x_center + jitter_x), 
-            int(((btn_box[1] + btn_box[3]) / 2) + jitter_y)
-          )
-
-          # One last processing check
-          if not self.is_processing or not self.running or (self.stop_event and self.stop_event.is_set()):
-            Logger.log(App._LOG_HEADER, "Stopped signal detected, skipping click")
-            return False
-
-          self.auto_gui.click(click_target)
-          return True  # Found and clicked
-    
-    return False
+  # UI refresh
+  _REDRAW_INTERVAL_MS = 100 # At most one redraw per interval
 
+  # ================ Private Functions ================
 
   def _formatDuration(self, seconds: float) -> str:
     """
@@ -211,6 +84,44 @@ class App(tk.Tk):
       return f"{m}m {s}s"
 
 
+  def _loadRules(self) -> RuleSet:
+    """
+    Loads the click rules, falling back to a single 'farm' rule for the entered player
+
+    :return: Rules for the engine
+    :rtype: RuleSet
+    """
+
+    if os.path.isfile(App._RULES_FILE):
+      try:
+        return RuleSet.fromFile(App._RULES_FILE)
+      except (OSError, ValueError, TypeError) as e:
+        Logger.log(App._LOG_HEADER, f"ERROR: Invalid rules file '{App._RULES_FILE}': {e}")
+
+    return RuleSet([FarmRule(self.target_player)])
+
+
+  def _drainEvents(self):
+    """
+    Single UI callback: applies engine events and redraws at most once per interval
+    """
+
+    # Coalesce everything that arrived since the last frame
+    for kind, data in self.events.drain():
+      if kind == EventBus.STATUS:
+        self.stats["state"] = data["state"]
+      elif kind == EventBus.CYCLE:
+        self.stats["cycles"] += 1
+        self.stats["skipped"] += data["skipped"]
+        self.stats["runtime"] = data["runtime"]
+        self.stats["level"] = data["ocr"].get("level", self.stats["level"])
+        if data["clicked"]: self.stats["last_click"] = data["time"]
+
+    self.updateButtonText()
+    self.updateStatusText()
+    self.after(App._REDRAW_INTERVAL_MS, self._drainEvents)
+
+
   def _findExeWindow(self, windows, target_exe: str) -> tuple[str, int]:
     """
     Finds a window given it's exe name
@@ -259,7 +170,6 @@ class App(tk.Tk):
     # Class-private vars
     self.running = False
     self.start_time = None
-    self.timer_job = None
 
     # ============= ttk Styles =============
     style = ttk.Style(self)
@@ -304,6 +214,10 @@ class App(tk.Tk):
     )
     self.toggle_button.grid(row=3, column=0, columnspan=4, pady=15)
 
+    # --- Status ---
+    self.status_label = tk.Label(self, text="", justify="left", font=("Consolas", 9), **label_style)
+    self.status_label.grid(row=4, column=0, columnspan=4, sticky="w")
+
 
     # ---------- Find Discord Window ----------
 
@@ -316,13 +230,22 @@ class App(tk.Tk):
     self.target_title, self.target_hwnd = self._findExeWindow(windows, App._TARGET_EXE)
     self.auto_gui = AutoGui(self.target_title) if self.found else None
 
-    self.click_interval = None
-    self.is_processing = False
-    self.stop_event = threading.Event()
-
     self.lower_bound = 2.5
     self.upper_bound = 4.5
     self.target_player = "Player"
+
+    # Keep recent frames around so misses can be inspected later
+    self.recorder = FlightRecorder(App._RECORDER_DIR, App._RECORDER_MAX_BYTES)
+    self.bind(App._RECORDER_DUMP_KEY, lambda _: self.recorder.dump("manual", force=True))
+
+    # Capture -> OCR -> click loop, runs on its own thread and reports back through events
+    self.events = EventBus()
+    profiler = SamplingProfiler(App._PROFILER_DIR, App._PROFILER_THRESHOLD) if App._PROFILER_ENABLED else None
+    self.store = SessionStore(App._SESSION_DB)
+    self.engine = FarmEngine(self.window_manager, self.target_hwnd, self.auto_gui, self.recorder, self.events, profiler, self.store)
+    self.protocol("WM_DELETE_WINDOW", self.onClose)
+    self.stats = {"state": "Idle", "cycles": 0, "skipped": 0, "runtime": None, "last_click": None, "level": "-"}
+    self._drainEvents()
     
 
 
@@ -364,8 +287,8 @@ class App(tk.Tk):
     if self.start_time is None:
       Logger.log(App._LOG_HEADER, f"Started Bot ==> Player: {self.target_player} | Lower: {self.lower_bound} | Upper: {self.upper_bound}")
       self.start_time = time.time()
-      self.updateButtonText()
-      threading.Thread(target=self._threadedFarm, daemon=True).start() # Start running the farm
+      self.stats.update(cycles=0, skipped=0)
+      self.engine.start(self._loadRules(), self.lower_bound, self.upper_bound) # Start running the farm
 
 
 
@@ -374,31 +297,49 @@ class App(tk.Tk):
     Ran when the start/stop button is toggled to the "stop" state
     """
 
-    # Check if timer is valid
-    if self.timer_job is not None:
-      self.after_cancel(self.timer_job)
-      self.timer_job = None
-
     self.start_time = None
     Logger.log(App._LOG_HEADER, "Stopped Bot")
 
     # Signal the thread to exit immediately
     self.running = False
-    self.stop_event.set()
+    self.engine.stop()
+
+
+  def onClose(self):
+    """
+    Ran when the window is closed: stops the bot and flushes the session store
+    """
+
+    if self.running: self.toggleStartButton()
+    self.engine.join(App._CLOSE_TIMEOUT) # Let the farm thread persist its state first
+    self.store.close()
+    self.destroy()
 
 
   def updateButtonText(self):
     """
-    Updates the main logic of the game.
+    Shows the elapsed run time on the start/stop button
     """
 
     # Ensure app is actually running
     if not self.running or self.start_time is None: return
 
     elapsed = time.time() - self.start_time
-    self.toggle_button.config(text=f"Stop ({self._formatDuration(elapsed)})")
+    text = f"Stop ({self._formatDuration(elapsed)})"
+    if self.toggle_button.cget("text") != text:
+      self.toggle_button.config(text=text)
+
+
+  def updateStatusText(self):
+    """
+    Shows what the engine is doing, based on the coalesced events
+    """
+
+    stats = self.stats
+    runtime = f"{stats['runtime']:.2f}s" if stats["runtime"] is not None else "-"
+    last_click = f"{self._formatDuration(time.time() - stats['last_click'])} ago" if stats["last_click"] else "never"
+    skip_rate = f"{100 * stats['skipped'] / stats['cycles']:.0f}%" if stats["cycles"] else "-"
 
-    # Delay job
-    delay: int = 100 if elapsed < 60 else 1_000
-    self.timer_job = self.after(delay, self.updateButtonText)
-  
\ No newline at end of file
+    text = f"Status: {stats['state']}\nLast click: {last_click}\nCycle time: {runtime}\nSkipped: {skip_rate}\nOCR mode: {stats['level']}"
+    if self.status_label.cget("text") != text:
+      self.status_label.config(text=text)
@@ -0,0 +1,55 @@
+import time
+
+
+class CycleBudget:
+  """
+  CycleBudget Class
+
+  **Purpose:**
+    Time budget of one farm cycle, derived from its scheduled interval.
+    Stages check it and step down to cheaper strategies as it runs out,
+    so a loaded machine keeps clicking on time instead of falling behind.
+
+  **Usage:**
+    `budget = CycleBudget(seconds)` at the start of the cycle, then
+    `budget.expired()` / `budget.remaining()` inside the stages.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  # Degradation levels, most accurate (and expensive) first
+  FULL = "full"         # Detect + recognise the whole chat
+  TARGETED = "targeted" # Recognise only the boxes of the last matched embed
+  TEMPLATE = "template" # Template-match known button images only
+  LEVELS = (FULL, TARGETED, TEMPLATE)
+
+
+  # ================ Constructors ================
+
+  def __init__(self, seconds: float):
+    """
+    Start a new budget
+
+    :param seconds: Time available to the cycle, float("inf") for no limit
+    :type seconds: float
+    """
+
+    self.seconds = seconds
+    self.start = time.perf_counter()
+
+
+  # ================ Public Functions ================
+
+  def elapsed(self) -> float: return time.perf_counter() - self.start
+
+  def remaining(self) -> float: return self.seconds - self.elapsed()
+
+  def expired(self) -> bool: return self.remaining() <= 0
+
+  def used(self) -> float:
+    """
+    Fraction of the budget spent so far (0 for an unlimited budget)
+    """
+
+    return self.elapsed() / self.seconds if self.seconds not in (0, float("inf")) else 0.0
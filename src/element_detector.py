@@ -1,6 +1,96 @@
+import os
+import math
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 import cv2
-from rapidocr_onnxruntime import RapidOCR
+import numpy as np
 from src.logger import Logger
+from src.ocr_backends import OcrBackend, BackendSelector
+from src.recognition_cache import RecognitionCache
+
+
+class TextResults:
+  """
+  Compact, reusable container for the text found in one image.
+
+  Boxes and scores live in preallocated numpy arrays that only grow when a
+  frame holds more lines than ever before, so the steady-state loop does not
+  allocate a new list of tuples every cycle.
+  """
+
+  def __init__(self, capacity: int = 64):
+    """
+    Create an empty result set
+
+    :param capacity: Number of lines to preallocate room for
+    :type capacity: int
+    """
+
+    self.count = 0
+    self.texts: list[str] = [""] * capacity
+    self.boxes = np.zeros((capacity, 4), dtype=np.int32) # x_min, y_min, x_max, y_max
+    self.scores = np.zeros(capacity, dtype=np.float32)
+
+
+  def __len__(self) -> int: return self.count
+
+  def __iter__(self):
+    """
+    Iterate over (text, box) pairs, matching the old list-of-tuples layout
+    """
+    for i in range(self.count):
+      yield self.texts[i], tuple(int(v) for v in self.boxes[i])
+
+
+  def clear(self):
+    """
+    Forget all lines while keeping the allocated storage
+    """
+    self.count = 0
+
+
+  def append(self, text: str, x_min: int, y_min: int, x_max: int, y_max: int, score: float):
+    """
+    Add a line, growing the storage if needed
+
+    :param text: Recognised text
+    :type text: str
+    :param score: Recognition confidence
+    :type score: float
+    """
+
+    # Double capacity when full (rare after the first few frames)
+    if self.count == len(self.texts):
+      capacity = len(self.texts) * 2
+      self.texts.extend([""] * (capacity - len(self.texts)))
+      self.boxes = np.resize(self.boxes, (capacity, 4))
+      self.scores = np.resize(self.scores, capacity)
+
+    i = self.count
+    self.texts[i] = text
+    self.boxes[i, 0] = x_min
+    self.boxes[i, 1] = y_min
+    self.boxes[i, 2] = x_max
+    self.boxes[i, 3] = y_max
+    self.scores[i] = score
+    self.count += 1
+
+
+  def offset(self, dx: int, dy: int):
+    """
+    Shift every box in place
+
+    :param dx: Amount to add to the x coordinates
+    :type dx: int
+    :param dy: Amount to add to the y coordinates
+    :type dy: int
+    """
+
+    self.boxes[:self.count, 0::2] += dx
+    self.boxes[:self.count, 1::2] += dy
 
 
 class ElementDetector:
@@ -19,12 +109,46 @@ class ElementDetector:
 
   _LOG_HEADER: str = "ElementDetector"
 
-  language = ""
-  engine = None
-  initialized = False
+  # Backend selection
+  _SAMPLES_DIR = "ocr_samples" # Labelled frames used to benchmark backends
+  _BACKEND_CACHE = "ocr_backend.json" # Cached selection per host
+  _MIN_ACCURACY = 0.9 # Fraction of sample lines a backend must read correctly
 
-  # ================ Private Functions ================
+  # Recognition cache
+  _CACHE_PATH = "recognition_cache.json" # On-disk tier, so a restarted bot starts warm
+  _CACHE_MAX_ENTRIES = 4096
+  _CACHE_MAX_BYTES = 1024 * 1024
+  _CACHE_SAVE_EVERY = 256 # New lines between two saves of the on-disk tier
+
+  # Adaptive resolution (detection only, lines are always recognised at full resolution)
+  _DETECT_TEXT_HEIGHT = 14.0 # px, line height detection still separates lines at
+  _MIN_SCALE = 0.35 # Never shrink further than this
+  _MAX_SCALE = 0.9 # Scales above this are not worth a resize
+  _SCALE_STEP = 0.05
+
+  # Tiled mode (tall chat regions)
+  _TILE_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2)) # 1 disables tiling
+  _TILE_MIN_HEIGHT = 1200 # px (after downscaling), shorter images are read in one piece
+  _TILE_HEIGHT = 480 # px per strip, before overlap
+  _TILE_OVERLAP = 96 # px shared by neighbouring strips, more than one line so no line is cut in both
+  _DUPLICATE_OVERLAP = 0.5 # Fraction of the smaller box that must overlap for two lines to be the same
 
+  # Streaming mode
+  _STREAM_BATCH = 4 # Lines recognised per batch while streaming bottom-up
+  _RETRY_SCORE = 0.8 # Lines a combined-pipeline backend read below this at reduced scale are re-read at full resolution
+
+  language = ""
+  backend: OcrBackend | None = None
+  cache: RecognitionCache | None = None
+  last_stats: dict = {} # Counters of the most recent detectText() call
+  text_height: float | None = None # Median full-resolution line height of the previous frame
+  initialized = False
+  _unsaved = 0
+  _scaled = None # Reused downscale buffer
+  _full_res_time: float | None = None # Running detection time of full-resolution frames (s), the only stage scaling changes
+  _pool: ThreadPoolExecutor | None = None
+  _pool_backends: queue.SimpleQueue | None = None # One backend per worker, taken while in use
+  _save_lock = threading.Lock()
 
   # ================ Public Functions ================
 
@@ -33,16 +157,36 @@ class ElementDetector:
 
 
   @classmethod
-  def init(cls):
+  def init(cls, backend: OcrBackend | None = None):
     """
-    Initialize PaddleOCR for use
+    Initialize the OCR backend for use
+
+    :param backend: Backend to use, the fastest accurate one on this host is picked if None
+    :type backend: OcrBackend | None
     """
 
     # Already initialized, just return
     if cls.isInit(): return 
 
     # Initialize OCR
-    cls.engine = RapidOCR()
+    if backend is None:
+      backend = BackendSelector.select(cls._SAMPLES_DIR, cls._BACKEND_CACHE, cls._MIN_ACCURACY)
+    cls.backend = backend
+    cls.backend.warmUp()
+
+    # Worker pool for tiled mode, ONNX threads are split across the workers
+    if cls._TILE_WORKERS > 1:
+      threads = max(1, (os.cpu_count() or 1) // cls._TILE_WORKERS)
+      cls._pool = ThreadPoolExecutor(cls._TILE_WORKERS, thread_name_prefix="ocr")
+      cls._pool_backends = queue.SimpleQueue()
+      for _ in range(cls._TILE_WORKERS):
+        worker_backend = cls.backend.clone(threads)
+        if worker_backend is not cls.backend: worker_backend.warmUp()
+        cls._pool_backends.put(worker_backend)
+
+    # Start with whatever was recognised in previous sessions
+    cls.cache = RecognitionCache(cls._CACHE_MAX_ENTRIES, cls._CACHE_MAX_BYTES, cls._CACHE_PATH)
+    cls.cache.load()
 
     # Mark as initialized
     cls.initialized = True
@@ -55,48 +199,512 @@ class ElementDetector:
     Uninitialize the ElementDetector Class
     """
 
+    if cls.cache: cls.cache.save()
+    if cls._pool: cls._pool.shutdown(wait=False, cancel_futures=True)
+
+    cls._pool = None
+    cls._pool_backends = None
     cls.language = ""
-    cls.engine = None
-    cls.initialized = True
+    cls.backend = None
+    cls.cache = None
+    cls.initialized = False
   
 
   @classmethod
-  def detectText(cls, img, min_score: float = 0.6) -> list[str] | None:
+  def detectText(cls, img, min_score: float = 0.6, out: TextResults | None = None, stop_when=None) -> TextResults:
     """
     Finds all text regions in an image
     
     :param img: Image to read (cv2.imread or image_path)
     :param min_score: Minimum confidence score to be accepted.
-    :type min_scoreimg: float
-    :return: List of found text & their positions
-    :rtype: list[str]
+    :type min_score: float
+    :param out: Result container to reuse, a new one is created if None
+    :type out: TextResults | None
+    :param stop_when: In tiled mode, called with the partial results after each strip (bottom first); returning True skips the remaining strips
+    :return: Found text & their positions
+    :rtype: TextResults
     """
 
+    # Reuse the caller's storage when given
+    if out is None: out = TextResults()
+    out.clear()
+
     # Ensure the image passed is loaded as a cv2 image
     if isinstance(img, str):
       img = cv2.imread(img)
     
-    # Returns: [result, elapsed_time]
-    result, _ = cls.engine(img)
-    if result is None: return []
+    start = time.perf_counter()
+    stats = {}
+
+    # Detect on a downscaled copy, recognise on the full resolution image
+    scale = cls._pickScale()
+    work = img if scale == 1.0 else cls._resize(img, scale)
+    if cls._pool and work.shape[0] >= cls._TILE_MIN_HEIGHT:
+      lines = cls._readTiled(work, img, scale, stats, min_score, stop_when)
+    else:
+      lines = cls._readLines(work, img, scale, stats, cls.backend)
+
+    # Backends that recognise while detecting read at reduced scale, low-confidence lines get a second chance
+    retry_indices = []
+    if scale != 1.0 and not cls.backend.split_pipeline:
+      retry_indices = [i for i, (_, _, score) in enumerate(lines) if score < cls._RETRY_SCORE]
 
-    ret = []
-    for line in result: # Line structure ==> [ [[x1,y1],[x2,y2],[x3,y3],[x4,y4]], text, confidence ]
+    if retry_indices:
+      retried = cls.backend.recognize(img, [lines[i][0] for i in retry_indices])
+      for i, (text, score) in zip(retry_indices, retried):
+        if score > lines[i][2]: lines[i] = (lines[i][0], text, score)
+
+    heights = []
+    for (x_min, y_min, x_max, y_max), text, score in lines:
       # Check if score is at required minimum
-      score = float(line[2])
       if score < min_score: continue
+      out.append(text, x_min, y_min, x_max, y_max, score)
+      heights.append(y_max - y_min)
+
+    # Next frame is scaled from this frame's text height
+    if heights: cls.text_height = float(np.median(heights))
+
+    stats.update(lines=len(lines), scale=scale, retried=len(retry_indices), ocr_time=time.perf_counter() - start)
+    cls._trackSpeedup(stats, scale)
+    cls.last_stats = stats
+    return out
+
+
+  @classmethod
+  def recognizeBoxes(cls, img, boxes: list, min_score: float = 0.6, out: TextResults | None = None) -> TextResults:
+    """
+    Reads only the given boxes, skipping detection (for when the layout is already known)
+
+    :param img: cv2 image
+    :param boxes: Line boxes (x_min, y_min, x_max, y_max) in `img` coordinates
+    :type boxes: list
+    :param min_score: Minimum confidence score to be accepted.
+    :type min_score: float
+    :param out: Result container to reuse, a new one is created if None
+    :type out: TextResults | None
+    :return: Text read in the boxes
+    :rtype: TextResults
+    """
+
+    if out is None: out = TextResults()
+    out.clear()
+
+    start = time.perf_counter()
+    stats = {}
+    for (x_min, y_min, x_max, y_max), text, score in cls._recognizeCached(img, boxes, stats, cls.backend):
+      if score >= min_score: out.append(text, x_min, y_min, x_max, y_max, score)
+
+    stats.update(lines=len(boxes), ocr_time=time.perf_counter() - start)
+    cls.last_stats = stats
+    return out
+
+
+  @classmethod
+  def getState(cls) -> dict:
+    """
+    Calibration learned while running, for persisting across sessions
+
+    :return: JSON-serializable state
+    :rtype: dict
+    """
+
+    return {"text_height": cls.text_height, "full_res_det_time": cls._full_res_time}
+
+
+  @classmethod
+  def setState(cls, state: dict):
+    """
+    Restore calibration from a previous session, so the first frame is already read at the right scale
+
+    :param state: State from getState()
+    :type state: dict
+    """
+
+    cls.text_height = state.get("text_height", cls.text_height)
+    cls._full_res_time = state.get("full_res_det_time", cls._full_res_time)
+
+
+  @classmethod
+  def usesTiles(cls, img) -> bool:
+    """
+    Would detectText() read this image in tiled mode?
+
+    :param img: cv2 image
+    :return: True if the image is tall enough for tiling and the pool is running
+    :rtype: bool
+    """
+
+    return cls._pool is not None and img.shape[0] * cls._pickScale() >= cls._TILE_MIN_HEIGHT
+
+
+  @classmethod
+  def streamText(cls, img, min_score: float = 0.6):
+    """
+    Yields text lines progressively, from the bottom of the image up.
+    Detection runs once up front; recognition runs in small batches, so
+    closing the generator early skips recognising the remaining lines.
+    `last_stats` is filled in when the generator finishes or is closed.
+
+    :param img: cv2 image
+    :param min_score: Minimum confidence score to be accepted.
+    :type min_score: float
+    :return: Generator of (text, box, score), box in `img` coordinates
+    """
+
+    start = time.perf_counter()
+    stats = {}
+    scale = cls._pickScale()
+    work = img if scale == 1.0 else cls._resize(img, scale)
 
+    # Backends that read while detecting have nothing left to skip
+    det_start = time.perf_counter()
+    if cls.backend.split_pipeline:
+      read_lines = None
+      boxes = cls.backend.detect(work)
+      if scale != 1.0: boxes = cls._mapBoxes(boxes, scale, img.shape)
+    else:
+      read_lines = cls.backend.readText(work)
+      if scale != 1.0: read_lines = cls._mapLines(read_lines, scale, img.shape)
+      boxes = [box for box, _, _ in read_lines]
+    stats["det_time"] = time.perf_counter() - det_start
 
-      # Create box
-      box_points = line[0]
-      xs = [p[0] for p in box_points]
-      ys = [p[1] for p in box_points]
-      box = (int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys)))
+    # Lowest lines first, that is where new embeds appear
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][3], reverse=True)
 
-      # Get text
-      text = line[1]
-      
-      # Append to list
-      ret.append((text, box))
+    recognized = 0
+    heights = []
+    try:
+      for begin in range(0, len(order), cls._STREAM_BATCH):
+        indices = order[begin:begin + cls._STREAM_BATCH]
+        if read_lines is None:
+          batch = cls._recognizeCached(img, [boxes[i] for i in indices], stats, cls.backend)
+        else:
+          batch = [read_lines[i] for i in indices]
+        recognized += len(batch)
+
+        # Re-read lines that were recognised at reduced scale with low confidence
+        if scale != 1.0 and read_lines is not None:
+          retry_indices = [i for i, (_, _, score) in enumerate(batch) if score < cls._RETRY_SCORE]
+          if retry_indices:
+            stats["retried"] = stats.get("retried", 0) + len(retry_indices)
+            for i, (text, score) in zip(retry_indices, cls.backend.recognize(img, [batch[i][0] for i in retry_indices])):
+              if score > batch[i][2]: batch[i] = (batch[i][0], text, score)
+
+        for box, text, score in batch:
+          if score < min_score: continue
+          heights.append(box[3] - box[1])
+          yield text, box, score
+
+    finally:
+      if heights: cls.text_height = float(np.median(heights))
+      stats.update(lines=len(boxes), recognized=recognized, skipped=len(boxes) - recognized, scale=scale, ocr_time=time.perf_counter() - start)
+      cls._trackSpeedup(stats, scale)
+      cls.last_stats = stats
+
+
+  # ================ Private Functions ================
+
+  @classmethod
+  def _trackSpeedup(cls, stats: dict, scale: float):
+    """
+    Learns the full-resolution detection time, and reports the speedup of downscaled frames against it
+
+    :param stats: Counters of the current call, holding `det_time`
+    :type stats: dict
+    :param scale: Scale detection ran at
+    :type scale: float
+    """
+
+    det_time = stats.get("det_time")
+    if not det_time: return
+
+    if scale == 1.0:
+      cls._full_res_time = det_time if cls._full_res_time is None else 0.8 * cls._full_res_time + 0.2 * det_time
+    elif cls._full_res_time:
+      stats["speedup"] = cls._full_res_time / det_time
+
+
+  @classmethod
+  def _pickScale(cls) -> float:
+    """
+    Picks the detection downscale factor for this frame from the previous frame's text height.
+    Only detection runs at this scale, so the target is what the detector needs, not the recogniser.
+
+    :return: Scale in (0, 1], 1.0 meaning no resize
+    :rtype: float
+    """
+
+    if cls.text_height is None or cls.text_height <= 0: return 1.0
+
+    # Snap to fixed steps so small jitter in the estimate keeps the resize buffer stable
+    scale = min(1.0, cls._DETECT_TEXT_HEIGHT / cls.text_height)
+    scale = max(cls._MIN_SCALE, math.floor(scale / cls._SCALE_STEP) * cls._SCALE_STEP)
+    if scale > cls._MAX_SCALE: return 1.0 # Not worth a resize
+    return scale
+
+
+  @classmethod
+  def _resize(cls, img, scale: float):
+    """
+    Downscales into a buffer that is reused while the size stays the same
+
+    :param img: Full resolution image
+    :param scale: Scale factor
+    :type scale: float
+    :return: Downscaled image
+    """
+
+    height, width = img.shape[:2]
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    if cls._scaled is None or cls._scaled.shape[:2] != (size[1], size[0]) or cls._scaled.shape[2:] != img.shape[2:]:
+      cls._scaled = None
+    cls._scaled = cv2.resize(img, size, dst=cls._scaled, interpolation=cv2.INTER_AREA)
+    return cls._scaled
+
+
+  @classmethod
+  def _mapLines(cls, lines: list, scale: float, shape: tuple) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Maps line boxes from a downscaled image back to full resolution
+
+    :param lines: List of (box, text, score) in downscaled coordinates
+    :type lines: list
+    :param scale: Scale the lines were read at
+    :type scale: float
+    :param shape: Full resolution image shape, used to clamp the boxes
+    :type shape: tuple
+    :return: List of (box, text, score) in full resolution coordinates
+    :rtype: list[tuple[tuple[int, int, int, int], str, float]]
+    """
+
+    boxes = cls._mapBoxes([box for box, _, _ in lines], scale, shape)
+    return [(box, text, score) for box, (_, text, score) in zip(boxes, lines)]
+
+
+  @classmethod
+  def _mapBoxes(cls, boxes: list, scale: float, shape: tuple) -> list[tuple[int, int, int, int]]:
+    """
+    Maps boxes from a downscaled image back to full resolution
+
+    :param boxes: Boxes in downscaled coordinates
+    :type boxes: list
+    :param scale: Scale the boxes were found at
+    :type scale: float
+    :param shape: Full resolution image shape, used to clamp the boxes
+    :type shape: tuple
+    :return: Boxes in full resolution coordinates
+    :rtype: list[tuple[int, int, int, int]]
+    """
+
+    height, width = shape[:2]
+    return [
+      (
+        int(x_min / scale), int(y_min / scale),
+        min(width, int(math.ceil(x_max / scale))), min(height, int(math.ceil(y_max / scale)))
+      )
+      for x_min, y_min, x_max, y_max in boxes
+    ]
+
+
+  @classmethod
+  def _readTiled(cls, work, img, scale: float, stats: dict, min_score: float, stop_when) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Reads overlapping horizontal strips concurrently, bottom strip first
+
+    :param work: Image to detect on (possibly downscaled)
+    :param img: Full resolution image, lines are recognised on it
+    :param scale: Scale of `work`
+    :type scale: float
+    :param stats: Per-call counters to add to
+    :type stats: dict
+    :param min_score: Minimum score for lines handed to `stop_when`
+    :type min_score: float
+    :param stop_when: Early-exit predicate taking a TextResults, or None
+    :return: Merged list of (box, text, score), in full resolution coordinates
+    :rtype: list[tuple[tuple[int, int, int, int], str, float]]
+    """
+
+    # Strip tops, bottom of the chat (where new embeds appear) first
+    height = work.shape[0]
+    step = cls._TILE_HEIGHT
+    tops = list(range(0, max(1, height - cls._TILE_OVERLAP), step))
+    tops.reverse()
+
+    def readStrip(top: int, strip_stats: dict):
+      backend = cls._pool_backends.get()
+      try:
+        strip = work[top:min(height, top + step + cls._TILE_OVERLAP)]
+        return cls._readLines(strip, img, scale, strip_stats, backend, top)
+      finally:
+        cls._pool_backends.put(backend)
+
+    strip_stats = [{} for _ in tops]
+    futures = [cls._pool.submit(readStrip, top, strip_stats[i]) for i, top in enumerate(tops)]
+    index = {future: i for i, future in enumerate(futures)}
+    strip_lines = [None] * len(futures)
+    pending = set(futures)
+    lines = []
+    merged = 0 # Strips merged so far, always a run from the bottom so `stop_when` never sees an older embed without the newer ones
+    stopped = False
+    while pending:
+      done, pending = wait(pending, return_when=FIRST_COMPLETED)
+      for future in done:
+        strip_lines[index[future]] = future.result()
+
+      first = merged
+      while merged < len(futures) and strip_lines[merged] is not None:
+        lines = cls._mergeLines(lines, strip_lines[merged])
+        merged += 1
+
+      # Stop as soon as the caller found what it was looking for
+      if stop_when and pending and merged > first:
+        partial = TextResults()
+        for (x_min, y_min, x_max, y_max), text, score in lines:
+          if score >= min_score: partial.append(text, x_min, y_min, x_max, y_max, score)
+        if stop_when(partial):
+          stopped = True
+          for future in pending: future.cancel()
+          break
+
+    # Strips already running cannot be cancelled, they read the caller's buffers and write to the cache
+    if stopped:
+      wait([future for future in pending if not future.cancelled()])
+
+    stats.update(
+      tiles=len(tops),
+      tiles_skipped=sum(1 for future in pending if future.cancelled()) if stopped else 0,
+      cache_hits=sum(s.get("cache_hits", 0) for s in strip_stats),
+    )
+    if not stopped: stats["det_time"] = sum(s.get("det_time", 0.0) for s in strip_stats) # Summed over workers, comparable between scales
+    if cls.cache: stats["cache_hit_rate"] = cls.cache.hitRate()
+    return lines
+
+
+  @classmethod
+  def _mergeLines(cls, lines: list, new_lines: list) -> list:
+    """
+    Merges lines from another strip, dropping duplicates read twice in the overlap.
+    Of two duplicates the larger box wins, since a line cut by a strip edge comes out smaller.
+
+    :param lines: Lines merged so far
+    :type lines: list
+    :param new_lines: Lines of the next strip
+    :type new_lines: list
+    :return: Merged lines
+    :rtype: list
+    """
+
+    merged = list(lines)
+    for new_line in new_lines:
+      new_box = new_line[0]
+      new_area = cls._area(new_box)
+      duplicate = False
+      for i, line in enumerate(merged):
+        box = line[0]
+        overlap = cls._area((max(box[0], new_box[0]), max(box[1], new_box[1]), min(box[2], new_box[2]), min(box[3], new_box[3])))
+        if overlap < cls._DUPLICATE_OVERLAP * min(new_area, cls._area(box)): continue
+
+        duplicate = True
+        if (new_area, new_line[2]) > (cls._area(box), line[2]): merged[i] = new_line
+        break
+
+      if not duplicate: merged.append(new_line)
+    return merged
+
+
+  @staticmethod
+  def _area(box: tuple) -> int:
+    return max(0, box[2] - box[0]) * max(0, box[3] - box[1])
+
+
+  @classmethod
+  def _readLines(cls, work, img, scale: float, stats: dict, backend: OcrBackend, top: int = 0) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Detects lines on `work` and recognises them on the full resolution image,
+    skipping lines the cache has seen before
+
+    :param work: Image (or strip of it) to detect on, possibly downscaled
+    :param img: Full resolution image
+    :param scale: Scale of `work`
+    :type scale: float
+    :param stats: Per-call counters to add to
+    :type stats: dict
+    :param backend: Backend to read with
+    :type backend: OcrBackend
+    :param top: Row of `work` inside the downscaled image, for strips
+    :type top: int
+    :return: List of (box, text, score), in full resolution coordinates
+    :rtype: list[tuple[tuple[int, int, int, int], str, float]]
+    """
+
+    # Backends that read while detecting gain nothing from the cache
+    det_start = time.perf_counter()
+    if not backend.split_pipeline:
+      lines = [((x_min, y_min + top, x_max, y_max + top), text, score) for (x_min, y_min, x_max, y_max), text, score in backend.readText(work)]
+      stats["det_time"] = stats.get("det_time", 0.0) + time.perf_counter() - det_start
+      return cls._mapLines(lines, scale, img.shape) if scale != 1.0 else lines
+
+    boxes = [(x_min, y_min + top, x_max, y_max + top) for x_min, y_min, x_max, y_max in backend.detect(work)]
+    stats["det_time"] = stats.get("det_time", 0.0) + time.perf_counter() - det_start
+    if scale != 1.0: boxes = cls._mapBoxes(boxes, scale, img.shape)
+    return cls._recognizeCached(img, boxes, stats, backend)
+
+
+  @classmethod
+  def _recognizeCached(cls, img, boxes: list, stats: dict, backend: OcrBackend) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Recognises the given boxes, skipping the model for lines the cache has seen before
+
+    :param img: Image the boxes refer to
+    :param boxes: Line boxes to read
+    :type boxes: list
+    :param stats: Per-call counters to add to
+    :type stats: dict
+    :param backend: Backend to read with
+    :type backend: OcrBackend
+    :return: List of (box, text, score), in the order of `boxes`
+    :rtype: list[tuple[tuple[int, int, int, int], str, float]]
+    """
+
+    # Look every line up in the cache
+    lines = [None] * len(boxes)
+    miss_indices, miss_keys = [], []
+    for i, box in enumerate(boxes):
+      crop = OcrBackend.cropBox(img, box)
+      if crop.size == 0:
+        lines[i] = ("", 0.0)
+        continue
+
+      key = RecognitionCache.key(crop)
+      lines[i] = cls.cache.get(key)
+      if lines[i] is None:
+        miss_indices.append(i)
+        miss_keys.append(key)
+
+    # One batched recognition call for all misses
+    if miss_indices:
+      recognized = backend.recognize(img, [boxes[i] for i in miss_indices])
+      for i, key, line in zip(miss_indices, miss_keys, recognized):
+        lines[i] = line
+        cls.cache.put(key, line)
+      cls._saveCacheEventually(len(miss_indices))
+
+    stats["cache_hits"] = stats.get("cache_hits", 0) + len(boxes) - len(miss_indices)
+    stats["cache_hit_rate"] = cls.cache.hitRate()
+    return [(box, text, score) for box, (text, score) in zip(boxes, lines)]
+
+
+  @classmethod
+  def _saveCacheEventually(cls, new_lines: int):
+    """
+    Persist the cache once enough new lines were added since the last save
+
+    :param new_lines: Lines added to the cache by this call
+    :type new_lines: int
+    """
 
-    return ret
\ No newline at end of file
+    with cls._save_lock:
+      cls._unsaved += new_lines
+      if cls._unsaved < cls._CACHE_SAVE_EVERY: return
+      cls._unsaved = 0
+    cls.cache.save()
@@ -0,0 +1,69 @@
+import queue
+
+
+class EventBus:
+  """
+  EventBus Class
+
+  **Purpose:**
+    One-way channel from the farm thread to the UI thread. The producer
+    never blocks or takes a lock held by the UI, and the UI never touches
+    the engine's state directly.
+
+  **Usage:**
+    The engine calls `post(kind, **data)`; the UI calls `drain()` from a
+    single `after` callback and handles the returned events in order.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "EventBus"
+
+  # Event kinds
+  STATUS = "status" # data: state
+  CYCLE = "cycle"   # data: clicked, runtime, skipped, time, ocr
+
+
+  # ================ Constructors ================
+
+  def __init__(self, max_drain: int = 256):
+    """
+    Initialize a new EventBus
+
+    :param max_drain: Maximum events handed out by one `drain()` call, so a backlog cannot stall the UI
+    :type max_drain: int
+    """
+
+    self.max_drain = max_drain
+    self._queue = queue.SimpleQueue()
+
+
+  # ================ Public Functions ================
+
+  def post(self, kind: str, **data):
+    """
+    Publish an event, safe to call from any thread
+
+    :param kind: Event kind, one of the class constants
+    :type kind: str
+    """
+
+    self._queue.put((kind, data))
+
+
+  def drain(self) -> list[tuple[str, dict]]:
+    """
+    Take all pending events without blocking
+
+    :return: List of (kind, data), oldest first
+    :rtype: list[tuple[str, dict]]
+    """
+
+    events = []
+    try:
+      while len(events) < self.max_drain:
+        events.append(self._queue.get_nowait())
+    except queue.Empty:
+      pass
+    return events
@@ -0,0 +1,681 @@
+import time
+import base64
+import random
+import hashlib
+import threading
+
+import cv2
+import numpy as np
+
+from src.logger import Logger
+from src.event_bus import EventBus
+from src.cycle_budget import CycleBudget
+from src.ocr_backends import TemplateBackend
+from src.farm_rules import FarmRule, RuleSet
+from src.element_detector import ElementDetector, TextResults
+
+
+class FarmEngine:
+  """
+  FarmEngine Class
+
+  **Purpose:**
+    Runs the capture -> OCR -> click loop, independent of the GUI so it can
+    also be driven by replayed frames.
+
+  **Usage:**
+    Construct with a capture source (anything with `getWindowTextureFromHwnd`)
+    and a clicker (anything with `click`), then call `start()` / `stop()`,
+    or call `runCycle()` directly to drive single cycles.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "FarmEngine"
+
+  # Bounds for Discord
+  _CROP_LEFT = 0.15 # How much of the image to crop off the left side
+  _CROP_RIGHT = 1.0 - (0.20) # How much of the image to crop off the right side | NOTE: Change the parentheses value.
+  _CROP_TOP = 0.1 # How much of the image to crop off the top side
+  _CROP_BOTTOM = 1.0 - (0.1) # How much of the image to crop off the bottom side | NOTE: Change the parentheses value.
+
+  _STATE_SAVE_EVERY = 60 # Cycles between two saves of the learned state
+
+  # Deadline budgeting
+  _BUDGET_FRACTION = 0.6 # Share of the scheduled interval a cycle may spend reading the chat
+  _FULL_PROBE_EVERY = 10 # Degraded cycles between two attempts at full OCR, to notice when load drops
+  _TARGET_PADDING = 40 # px added around the last embed's lines, in case the chat scrolled a bit
+  _MAX_TEMPLATES = 3 # Button images kept per label for the template level
+  _EMBED_GRID = 16 # px, resolution of the button position in embed ids
+  _IDLE = "idle" # Reported instead of a level when every rule was on cooldown and nothing was read
+
+
+  # ================ Constructors ================
+
+  def __init__(self, capture, hwnd: int, clicker, recorder=None, events: EventBus | None = None, profiler=None, store=None):
+    """
+    Initialize a new FarmEngine
+
+    :param capture: Frame source, e.g. WindowManager or ReplayCapture
+    :param hwnd: Window handle passed to the capture source (0 if no window was found)
+    :type hwnd: int
+    :param clicker: Click sink, e.g. AutoGui
+    :param recorder: Optional FlightRecorder to feed every cycle into
+    :param events: Optional EventBus to report status and cycle results on
+    :type events: EventBus | None
+    :param profiler: Optional SamplingProfiler attached to the farm thread
+    :param store: Optional SessionStore for cycle history and learned state
+    """
+
+    self.capture = capture
+    self.hwnd = hwnd
+    self.clicker = clicker
+    self.recorder = recorder
+    self.events = events
+    self.profiler = profiler
+    self.store = store
+
+    self.rules = RuleSet([FarmRule("player")])
+    self.early_stop = True # Stop OCR once every ready rule matched in the newest part of the chat
+    self.lower_bound = 2.5
+    self.upper_bound = 4.5
+
+    # Only the stop event is shared between threads, everything else is reported through `events`.
+    # Each run gets its own, so restarting cannot revive a thread that is still finishing its cycle
+    self.stop_event = threading.Event()
+
+    self._thread = None
+    self.mean_runtime: float | None = None # Running average cycle runtime (s)
+    self.cycles = 0
+
+    # Reused every cycle so the steady-state loop stays allocation-free
+    self._frame = None
+    self._results = TextResults()
+
+    # Degradation state: cost per level, what the last match looked like, learned button images
+    self.templates = TemplateBackend()
+    self.level_stats = {level: {"cycles": 0, "clicks": 0, "budget_used": 0.0} for level in CycleBudget.LEVELS}
+    self.cycle_stats: dict = {}
+    self._level_time: dict[str, float | None] = {level: None for level in CycleBudget.LEVELS}
+    self._last_boxes: list[tuple] = [] # Lines of the last matched embeds, in crop coordinates
+    self._anchors: dict[str, tuple] = {} # Rule key -> (name box, button box) of its last match, in crop coordinates
+    self._anchor_names: dict[str, str] = {} # Rule key -> text of that name line
+    self._degraded_cycles = 0
+
+    # Last embed clicked per rule (rule key -> embed id), persisted so a restart does not click it again
+    self._clicked_embeds: dict[str, dict] = {} # Rule key -> {"embed": id, "time": when it was clicked}
+    self._restored_embeds: dict[str, tuple[str, float]] = {} # Rule key -> (id, skipped until), clicked before the restart
+
+
+  # ================ Public Functions ================
+
+  def start(self, rules: RuleSet, lower_bound: float, upper_bound: float):
+    """
+    Start farming on a background thread
+
+    :param rules: Rules deciding which buttons to click
+    :type rules: RuleSet
+    :param lower_bound: Minimum delay between cycles (s)
+    :type lower_bound: float
+    :param upper_bound: Maximum delay between cycles (s)
+    :type upper_bound: float
+    """
+
+    # A stopped run may still be in its last cycle, the new thread waits for it
+    previous = self._thread if self._thread and self._thread.is_alive() else None
+
+    self.stop_event = threading.Event()
+    self._thread = threading.Thread(target=self.run, args=(self.stop_event, rules, lower_bound, upper_bound, previous), daemon=True)
+    self._thread.start()
+
+
+  def stop(self):
+    """
+    Signal the farm thread to exit as soon as possible
+    """
+
+    self.stop_event.set()
+
+
+  def join(self, timeout: float):
+    """
+    Wait for the farm thread to finish its current cycle and exit
+
+    :param timeout: Maximum seconds to wait
+    :type timeout: float
+    """
+
+    if self._thread: self._thread.join(timeout)
+
+
+  def run(self, stop_event: threading.Event, rules: RuleSet, lower_bound: float, upper_bound: float, previous: threading.Thread | None = None):
+    """
+    Background farming loop with fixed-rate scheduling
+
+    :param stop_event: Event ending this run
+    :type stop_event: threading.Event
+    :param rules: Rules deciding which buttons to click
+    :type rules: RuleSet
+    :param lower_bound: Minimum delay between cycles (s)
+    :type lower_bound: float
+    :param upper_bound: Maximum delay between cycles (s)
+    :type upper_bound: float
+    :param previous: Thread of the previous run, joined before touching any shared state
+    :type previous: threading.Thread | None
+    """
+
+    if previous: previous.join()
+
+    # Rules are rebuilt on every start, the same rule keeps its cooldown across Stop/Start
+    fired = {rule.key(): rule.last_fired for rule in self.rules.rules}
+    for rule in rules.rules:
+      rule.last_fired = max(rule.last_fired, fired.get(rule.key(), 0.0))
+
+    self.rules = rules
+    self.lower_bound = lower_bound
+    self.upper_bound = upper_bound
+    if self.cycles == 0: self._restoreState() # Later runs carry the session's state over instead
+
+    self._post(EventBus.STATUS, state="Running")
+    if self.profiler: self.profiler.start(threading.get_ident())
+    try:
+      interval = random.uniform(self.lower_bound, self.upper_bound)
+      next_time = time.time()
+      Logger.log(FarmEngine._LOG_HEADER, f"First run scheduled in {interval:.2f}s")
+
+      while not stop_event.is_set():
+        now = time.time()
+        sleep_time = next_time - now
+
+        # Wait, but can be interrupted
+        if sleep_time > 0:
+          stop_event.wait(timeout=sleep_time)
+
+        # Stop immediately if requested
+        if stop_event.is_set():
+          break
+
+        # The cycle may use part of its slot, the rest is left for the machine to catch up
+        if self.profiler: self.profiler.beginCycle()
+        start = time.time()
+        clicked = self.runCycle(CycleBudget(interval * FarmEngine._BUDGET_FRACTION), stop_event)
+        end = time.time()
+
+        runtime = end - start
+
+        # Schedule next run
+        next_time += interval
+        interval = random.uniform(self.lower_bound, self.upper_bound)
+
+        # Catch up if OCR ran long
+        skipped = next_time < time.time()
+        if skipped:
+          Logger.log(FarmEngine._LOG_HEADER, f"OCR overran interval (runtime={runtime:.2f}s), rescheduling")
+          next_time = time.time() + interval
+          if self.recorder: self.recorder.dump("overrun")
+
+        # Keep the stacks of slow or overrunning cycles
+        if self.profiler: self.profiler.endCycle(runtime, force=skipped)
+
+        self.reportCycle(clicked, runtime, skipped, end, max(0.0, next_time - time.time()))
+
+    finally:
+      self._saveState()
+      if self.profiler: self.profiler.stop()
+      for level, stats in self.level_stats.items():
+        if stats["cycles"]:
+          Logger.log(FarmEngine._LOG_HEADER, f"Level '{level}': {stats['cycles']} cycles, {stats['clicks']} clicks, mean budget used {stats['budget_used'] / stats['cycles']:.0%}")
+      self._post(EventBus.STATUS, state="Stopped")
+      Logger.log(FarmEngine._LOG_HEADER, "Thread exited cleanly")
+
+
+  def reportCycle(self, clicked: bool, runtime: float, skipped: bool, end: float, delay: float):
+    """
+    Logs, publishes and stores the outcome of one cycle
+
+    :param clicked: Was anything clicked?
+    :type clicked: bool
+    :param runtime: Cycle runtime (s)
+    :type runtime: float
+    :param skipped: Did the cycle overrun its slot?
+    :type skipped: bool
+    :param end: When the cycle finished (epoch s)
+    :type end: float
+    :param delay: Time until the next cycle (s)
+    :type delay: float
+    """
+
+    ocr_stats = dict(ElementDetector.last_stats) if self.cycle_stats.get("level") in (CycleBudget.FULL, CycleBudget.TARGETED) else {}
+    ocr_stats.update(self.cycle_stats)
+    Logger.log(FarmEngine._LOG_HEADER, f"Cycle done | Clicked={clicked} | Runtime={runtime:.2f}s | Next run in {delay:.2f}s | OCR {self._formatStats(ocr_stats)}")
+    self._post(EventBus.CYCLE, clicked=clicked, runtime=runtime, skipped=skipped, time=end, ocr=ocr_stats)
+
+    # Cycle history and learned state
+    self.cycles += 1
+    self.mean_runtime = runtime if self.mean_runtime is None else 0.9 * self.mean_runtime + 0.1 * runtime
+    if self.store:
+      self.store.recordCycle(end, runtime, clicked, skipped, ocr_stats)
+      if self.cycles % FarmEngine._STATE_SAVE_EVERY == 0: self._saveState()
+
+
+  def runCycle(self, budget: CycleBudget | None = None, stop_event: threading.Event | None = None) -> bool:
+    """
+    Captures one frame and clicks every button whose rule matches it
+
+    :param budget: Time the cycle may spend reading the chat, unlimited if None
+    :type budget: CycleBudget | None
+    :param stop_event: Event of the run this cycle belongs to, defaults to the current one
+    :type stop_event: threading.Event | None
+    :return: Was anything clicked?
+    :rtype: bool
+    """
+
+    # Check if function should run
+    if not self.hwnd: return False
+    if budget is None: budget = CycleBudget(float("inf"))
+    if stop_event is None: stop_event = self.stop_event
+
+    # Every rule is on cooldown, nothing this frame could show would be clicked
+    if self.rules.readyCount(time.time()) == 0:
+      self.cycle_stats = {"level": FarmEngine._IDLE}
+      return False
+
+    # Get discord texture into the reused frame buffer
+    self._frame = self.capture.getWindowTextureFromHwnd(self.hwnd, out=self._frame)
+    img_height, img_width = self._frame.shape[:2]
+
+    # ---- Crop bounds ----
+    left   = int(img_width * FarmEngine._CROP_LEFT)
+    right  = int(img_width * FarmEngine._CROP_RIGHT)
+    top    = int(img_height * FarmEngine._CROP_TOP)
+    bottom = int(img_height * FarmEngine._CROP_BOTTOM)
+
+    # Crop the screenshot (a view, no copy)
+    cropped_screenshot = self._frame[top:bottom, left:right]
+
+    # Read the chat with the most accurate level the budget allows, stepping down if a level runs out of time
+    now = time.time()
+    level, matches, player_seen = self._readChat(cropped_screenshot, budget, now)
+    results = self._results
+    self._trackLevel(level, budget)
+
+    # Leave function if stop button was pressed
+    if stop_event.is_set(): return False
+
+    # Remember the matched embeds for the cheaper levels (only exact boxes, targeted ones are padded)
+    if matches and level == CycleBudget.FULL: self._learnMatches(cropped_screenshot, matches)
+
+    # An embed clicked right before a restart waits until it would have been clicked again anyway
+    embeds = {rule: self._embedId(rule, btn_box, name_box) for rule, btn_box, name_box in matches}
+    already_clicked = [rule for rule, _, _ in matches if self._clickedBeforeRestart(rule, embeds[rule], now)]
+    if already_clicked: matches = [match for match in matches if match[0] not in already_clicked]
+
+    # Boxes were matched in crop coordinates, shift them back to screenshot coordinates
+    results.offset(left, top)
+    decision = {"clicked": False, "player_seen": player_seen, "level": level, "rules": [rule.name for rule, _, _ in matches]}
+    if already_clicked: decision["already_clicked"] = [rule.name for rule in already_clicked]
+    if not matches:
+      decision["reason"] = "already clicked" if already_clicked else ("no button" if player_seen else ("no player" if len(results) else "no text"))
+      self._record(cropped_screenshot, (left, top), (img_width, img_height), decision)
+      if player_seen and self.recorder: self.recorder.dump("miss") # Player was there but nothing to click
+      return False
+
+    targets = []
+    for rule, (btn_x_min, btn_y_min, btn_x_max, btn_y_max), _ in matches:
+      # One last processing check
+      if stop_event.is_set():
+        Logger.log(FarmEngine._LOG_HEADER, "Stopped signal detected, skipping click")
+        decision["reason"] = "stopped"
+        break
+
+      click_target = self._clickTarget((btn_x_min + left, btn_y_min + top, btn_x_max + left, btn_y_max + top))
+      Logger.log(FarmEngine._LOG_HEADER, f"Rule '{rule.name}' matched ({level})")
+      self.clicker.click(click_target)
+      rule.last_fired = now
+      self._clicked_embeds[rule.key()] = {"embed": embeds[rule], "time": now}
+      self._restored_embeds.pop(rule.key(), None)
+      targets.append(click_target)
+
+    decision["clicked"] = bool(targets)
+    decision["targets"] = targets
+    self.level_stats[level]["clicks"] += bool(targets)
+    self._record(cropped_screenshot, (left, top), (img_width, img_height), decision)
+    return bool(targets)  # Found and clicked
+
+
+  # ================ Private Functions ================
+
+  def _readChat(self, img, budget: CycleBudget, now: float) -> tuple[str, list, bool]:
+    """
+    Runs the degradation levels from the one the budget allows down to the template level
+
+    :param img: Cropped screenshot
+    :param budget: Time left for this cycle
+    :type budget: CycleBudget
+    :param now: Current time, for cooldowns
+    :type now: float
+    :return: Level that produced the result, matches (in crop coordinates), and whether a player was seen
+    :rtype: tuple[str, list, bool]
+    """
+
+    level = self._pickLevel(budget)
+    matches, player_seen = [], False
+    for stage in CycleBudget.LEVELS[CycleBudget.LEVELS.index(level):]:
+      level_start = budget.elapsed()
+      complete = True
+
+      if stage == CycleBudget.FULL:
+        complete = self._readFull(img, budget)
+        matches, player_seen = self.rules.evaluate(self._results.texts, self._results.boxes, len(self._results), now)
+      elif stage == CycleBudget.TARGETED:
+        if not self._last_boxes: continue
+        padded = self._paddedBoxes(img)
+        ElementDetector.recognizeBoxes(img, padded, out=self._results)
+        matches, player_seen = self.rules.evaluate(self._results.texts, self._results.boxes, len(self._results), now)
+
+        # Click and identify by the exact boxes, the padding is only there to tolerate a little scrolling
+        exact = dict(zip(padded, self._last_boxes))
+        matches = [(rule, exact.get(btn_box, btn_box), exact.get(name_box, name_box)) for rule, btn_box, name_box in matches]
+      else:
+        if not self.templates.templates or not self._hasAnchors(): break
+        self._results.clear()
+        player_seen = False # Nothing is read at this level, earlier evidence was discarded with the results
+        matches = self.rules.evaluateButtons(self.templates.readText(img), self._anchors, now)
+
+      # An interrupted level only tells us its cost is at least what it used
+      level = stage
+      cost = budget.elapsed() - level_start
+      known = self._level_time[level]
+      if complete or known is None or cost > known:
+        self._level_time[level] = cost if known is None else 0.8 * known + 0.2 * cost
+
+      # Step down only when the level ran out of time before finding anything
+      if matches or complete: break
+
+    return level, matches, player_seen
+
+
+  def _pickLevel(self, budget: CycleBudget) -> str:
+    """
+    Most accurate level expected to fit in the remaining budget
+    """
+
+    remaining = budget.remaining()
+    full_time = self._level_time[CycleBudget.FULL]
+    if full_time is None or full_time <= remaining or self._degraded_cycles >= FarmEngine._FULL_PROBE_EVERY:
+      self._degraded_cycles = 0
+      return CycleBudget.FULL
+
+    self._degraded_cycles += 1
+
+    targeted_time = self._level_time[CycleBudget.TARGETED]
+    if self._last_boxes and (targeted_time is None or targeted_time <= remaining):
+      return CycleBudget.TARGETED
+    if self.templates.templates and self._hasAnchors():
+      return CycleBudget.TEMPLATE
+    return CycleBudget.TARGETED if self._last_boxes else CycleBudget.FULL
+
+
+  def _readFull(self, img, budget: CycleBudget) -> bool:
+    """
+    Full OCR of the crop into `_results`, cut short once the budget is spent
+
+    :return: Did the read finish within the budget?
+    :rtype: bool
+    """
+
+    if self.early_stop and not ElementDetector.usesTiles(img):
+      return self._streamText(img, budget)
+
+    expired = False
+    def stopWhen(partial: TextResults) -> bool:
+      nonlocal expired
+      expired = budget.expired()
+      return expired or (self.early_stop and self._allMatched(partial))
+
+    ElementDetector.detectText(img, out=self._results, stop_when=stopWhen)
+    return not expired
+
+
+  def _streamText(self, img, budget: CycleBudget) -> bool:
+    """
+    Reads lines bottom-up and stops recognising as soon as every ready rule has its button
+
+    :param img: Cropped screenshot
+    :param budget: Recognition also stops once this is spent
+    :type budget: CycleBudget
+    :return: Did the read finish within the budget?
+    :rtype: bool
+    """
+
+    results = self._results
+    results.clear()
+
+    stream = ElementDetector.streamText(img)
+    try:
+      for text, (x_min, y_min, x_max, y_max), score in stream:
+        results.append(text, x_min, y_min, x_max, y_max, score)
+        if self._allMatched(results): break
+        if budget.expired(): return False
+    finally:
+      stream.close() # Skips recognising the remaining lines
+
+    return True
+
+
+  def _paddedBoxes(self, img) -> list[tuple]:
+    """
+    Last matched embed lines, grown a little and clipped to the crop
+    """
+
+    height, width = img.shape[:2]
+    pad = FarmEngine._TARGET_PADDING
+    return [
+      (max(0, x_min - pad), max(0, y_min - pad // 4), min(width, x_max + pad), min(height, y_max + pad // 4))
+      for x_min, y_min, x_max, y_max in self._last_boxes
+    ]
+
+
+  def _learnMatches(self, img, matches: list):
+    """
+    Keep the lines of the matched embeds (targeted level) and the button images (template level)
+
+    :param img: Cropped screenshot the matches were found in
+    :param matches: List of (rule, button box, name box), in crop coordinates
+    :type matches: list
+    """
+
+    results = self._results
+    boxes = []
+    for rule, btn_box, name_box in matches:
+      self._anchors[rule.key()] = (name_box, btn_box)
+      self._anchor_names[rule.key()] = self._lineText(name_box)
+
+      # Every line between the name and the button, so rules with a `text` can still match
+      for idx in range(len(results)):
+        box = tuple(int(v) for v in results.boxes[idx])
+        if box[1] >= name_box[1] and box[3] <= btn_box[3]: boxes.append(box)
+
+      if len(self.templates.templates.get(rule.button, [])) < FarmEngine._MAX_TEMPLATES:
+        self.templates.addTemplate(rule.button, TemplateBackend.cropBox(img, btn_box).copy())
+
+    self._last_boxes = list(dict.fromkeys(boxes))
+
+
+  def _trackLevel(self, level: str, budget: CycleBudget):
+    """
+    Record which level served the cycle and how much of its budget it used
+    """
+
+    used = budget.used()
+    stats = self.level_stats[level]
+    stats["cycles"] += 1
+    stats["budget_used"] += used
+    self.cycle_stats = {"level": level, "budget_used": used}
+
+
+  def _allMatched(self, partial: TextResults) -> bool:
+    """
+    Early-exit check for OCR: does every rule that is off cooldown already match the partial results?
+    """
+
+    now = time.time()
+    ready = self.rules.readyCount(now)
+    if ready == 0: return False
+
+    matches, _ = self.rules.evaluate(partial.texts, partial.boxes, len(partial), now)
+    return len(matches) == ready
+
+
+  def _clickedBeforeRestart(self, rule: FarmRule, embed: str, now: float) -> bool:
+    """
+    Is this the embed the rule clicked right before the restart, and is it still too early to click it again?
+    """
+
+    restored = self._restored_embeds.get(rule.key())
+    if restored is None: return False
+    if now >= restored[1]:
+      del self._restored_embeds[rule.key()]
+      return False
+    return restored[0] == embed
+
+
+  def _hasAnchors(self) -> bool: return any(rule.key() in self._anchors for rule in self.rules.rules)
+
+
+  def _lineText(self, box: tuple) -> str | None:
+    """
+    Text read in exactly this box this cycle (crop coordinates, before `_results` is offset), None if nothing was
+    """
+
+    results = self._results
+    return next((results.texts[idx] for idx in range(len(results)) if tuple(int(v) for v in results.boxes[idx]) == tuple(box)), None)
+
+
+  def _embedId(self, rule: FarmRule, btn_box: tuple, name_box: tuple) -> str:
+    """
+    Identifies an embed by its button box and the text of its name line (crop coordinates, before `_results` is offset).
+    The template level reads no text, the name remembered with the rule's anchor stands in for it.
+    """
+
+    name = self._lineText(name_box)
+    if name is None: name = self._anchor_names.get(rule.key(), "")
+    digest = hashlib.blake2b(name.lower().strip().encode(), digest_size=8).hexdigest()
+
+    # Button center on a coarse grid, so a pixel of detection jitter keeps the same id
+    grid = FarmEngine._EMBED_GRID
+    return f"{int(btn_box[0] + btn_box[2]) // (2 * grid)},{int(btn_box[1] + btn_box[3]) // (2 * grid)}|{digest}"
+
+
+  def _saveState(self):
+    """
+    Persist what was learned this session (OCR calibration, window size, cadence, rule cooldowns, clicked embeds,
+    button anchors and templates)
+    """
+
+    if not self.store: return
+
+    self.store.setState("ocr", ElementDetector.getState())
+    self.store.setState("cadence", {"mean_runtime": self.mean_runtime})
+    self.store.setState("rule_cooldowns", {rule.key(): rule.last_fired for rule in self.rules.rules})
+    self.store.setState("clicked_embeds", self._clicked_embeds)
+    if self._frame is not None:
+      self.store.setState("window", {"width": self._frame.shape[1], "height": self._frame.shape[0]})
+
+    # Where each rule's buttons were last matched, and the button images, for the template level
+    self.store.setState("button_anchors", {
+      key: {"name_box": list(name_box), "button_box": list(btn_box), "name": self._anchor_names.get(key) or ""}
+      for key, (name_box, btn_box) in self._anchors.items()
+    })
+    self.store.setState("button_templates", {
+      label: [base64.b64encode(cv2.imencode(".png", image)[1].tobytes()).decode("ascii") for image in images]
+      for label, images in self.templates.templates.items()
+    })
+
+
+  def _restoreState(self):
+    """
+    Pick up the state of the previous session, so the first cycle skips calibration
+    """
+
+    if not self.store: return
+
+    ElementDetector.setState(self.store.getState("ocr", {}))
+    self.mean_runtime = self.store.getState("cadence", {}).get("mean_runtime", self.mean_runtime)
+
+    # Rules clicked shortly before the restart stay on cooldown
+    cooldowns = self.store.getState("rule_cooldowns", {})
+    for rule in self.rules.rules:
+      rule.last_fired = max(rule.last_fired, cooldowns.get(rule.key(), 0.0))
+
+    # Embeds clicked before the restart may still be the newest ones on screen. They are skipped
+    # for one cooldown or cycle, whichever is longer, like they would have been without the restart
+    self._clicked_embeds = {key: entry for key, entry in self.store.getState("clicked_embeds", {}).items() if isinstance(entry, dict)}
+    for rule in self.rules.rules:
+      entry = self._clicked_embeds.get(rule.key())
+      if entry: self._restored_embeds[rule.key()] = (entry["embed"], entry["time"] + max(rule.cooldown, self.lower_bound))
+
+    # Preallocate the frame buffer at the last known window size
+    window = self.store.getState("window")
+    if window and self._frame is None:
+      self._frame = np.empty((window["height"], window["width"], 3), dtype=np.uint8)
+
+    # Template level works from the first cycle if buttons were seen before, at the positions they were seen
+    for key, anchor in self.store.getState("button_anchors", {}).items():
+      self._anchors[key] = (tuple(anchor["name_box"]), tuple(anchor["button_box"]))
+      self._anchor_names[key] = anchor["name"]
+    for label, images in self.store.getState("button_templates", {}).items():
+      for data in images[len(self.templates.templates.get(label, [])):FarmEngine._MAX_TEMPLATES]:
+        image = cv2.imdecode(np.frombuffer(base64.b64decode(data), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is not None: self.templates.addTemplate(label, image)
+
+
+  def _formatStats(self, stats: dict) -> str:
+    """
+    Formats a stats dict as 'key=value' pairs for the log
+    """
+
+    return " ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in stats.items())
+
+
+  def _post(self, kind: str, **data):
+    """
+    Report an event to the UI, if anyone is listening
+    """
+
+    if self.events: self.events.post(kind, **data)
+
+
+  def _record(self, crop, offset: tuple[int, int], window_size: tuple[int, int], decision: dict):
+    """
+    Feed the current cycle into the flight recorder, if one is attached
+    """
+
+    if self.recorder: self.recorder.record(crop, offset, window_size, self._results, decision)
+
+
+  def _clickTarget(self, btn_box: tuple) -> tuple[int, int]:
+    """
+    Picks a randomised point inside a button
+
+    :param btn_box: x_min, y_min, x_max, y_max of the button
+    :type btn_box: tuple
+    :return: Position to click
+    :rtype: tuple[int, int]
+    """
+
+    btn_x_min, btn_y_min, btn_x_max, btn_y_max = btn_box
+
+    # Define the button's click area (inner 60% of the button to be safe)
+    half_width = (btn_x_max - btn_x_min) * 0.3
+    half_height = (btn_y_max - btn_y_min) * 0.3
+
+    # Add random jitter so we don't click the same pixel twice
+    jitter_x = random.uniform(-half_width, half_width)
+    jitter_y = random.uniform(-half_height, half_height)
+
+    return (
+      int(((btn_x_min + btn_x_max) / 2) + jitter_x),
+      int(((btn_y_min + btn_y_max) / 2) + jitter_y)
+    )
@@ -0,0 +1,234 @@
+import json
+
+import numpy as np
+
+from src.logger import Logger
+
+
+class FarmRule:
+  """
+  A single "when an embed for `player` contains `text`, click `button`" rule
+  """
+
+  def __init__(self, player: str, button: str = "farm", text: str = "", cooldown: float = 0.0, name: str = ""):
+    """
+    Create a new rule
+
+    :param player: Player name the embed must mention
+    :type player: str
+    :param button: Label of the button to click
+    :type button: str
+    :param text: Extra text the embed must contain between the name and the button (optional)
+    :type text: str
+    :param cooldown: Minimum seconds between two clicks of this rule
+    :type cooldown: float
+    :param name: Name used in logs, defaults to the button label
+    :type name: str
+    """
+
+    self.player = player.lower().strip()
+    self.button = button.lower().strip()
+    self.text = text.lower().strip()
+    self.cooldown = cooldown
+    self.name = name or self.button
+    self.last_fired = 0.0
+
+
+  def isReady(self, now: float) -> bool: return now - self.last_fired >= self.cooldown
+
+  def key(self) -> str: return f"{self.player}|{self.button}|{self.text}" # Same rule across reloads and restarts
+
+
+class RuleSet:
+  """
+  RuleSet Class
+
+  **Purpose:**
+    Evaluates every FarmRule against one frame's OCR result in a single pass,
+    so one capture can drive farm, harvest, sell, etc. without extra OCR.
+
+  **Usage:**
+    Build from a list of FarmRule or `RuleSet.fromFile("rules.json")`, then
+    call `evaluate()` with the frame's TextResults. Rules are indexed by
+    button label, so lines that are not a known button cost one dict lookup.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "RuleSet"
+
+  _DISCORD_COMMAND_TEXT = "used /" # Header line of a slash command, never the embed itself
+  _MAX_VERTICAL_GAP = 500 # px between the name and its button
+  _MAX_HORIZONTAL_OFFSET = 200 # px between the name and button centers
+  _MAX_BUTTON_DRIFT = 16 # px a button found without its name may be (center to center) from where it was last matched
+
+
+  # ================ Constructors ================
+
+  def __init__(self, rules: list[FarmRule]):
+    """
+    Compile a list of rules
+
+    :param rules: Rules to evaluate, earlier rules win when two match the same button
+    :type rules: list[FarmRule]
+    """
+
+    self.rules = rules
+    self.players = {rule.player for rule in rules}
+
+    # Button label -> rules clicking that button
+    self.by_button: dict[str, list[FarmRule]] = {}
+    for rule in rules:
+      self.by_button.setdefault(rule.button, []).append(rule)
+
+
+  @classmethod
+  def fromFile(cls, path: str) -> "RuleSet":
+    """
+    Load rules from a JSON file holding a list of FarmRule keyword arguments
+
+    Example: [{"player": "me", "button": "farm"}, {"player": "me", "button": "sell", "text": "full", "cooldown": 60}]
+
+    :param path: JSON file to load
+    :type path: str
+    :return: Compiled rule set
+    :rtype: RuleSet
+    """
+
+    with open(path, encoding="utf-8") as file:
+      rules = [FarmRule(**entry) for entry in json.load(file)]
+
+    Logger.log(RuleSet._LOG_HEADER, f"Loaded {len(rules)} rules from '{path}'")
+    return cls(rules)
+
+
+  # ================ Public Functions ================
+
+  def readyCount(self, now: float) -> int: return sum(1 for rule in self.rules if rule.isReady(now))
+
+
+  def evaluate(self, texts: list[str], boxes, count: int, now: float) -> tuple[list[tuple[FarmRule, tuple, tuple]], bool]:
+    """
+    Finds, for every ready rule, the button of the most recent matching embed
+
+    :param texts: Recognised text per line
+    :type texts: list[str]
+    :param boxes: (N, 4) array of x_min, y_min, x_max, y_max per line, in screenshot coordinates
+    :param count: Number of valid lines
+    :type count: int
+    :param now: Current time, for cooldowns
+    :type now: float
+    :return: List of (rule, button box, name box) to click, and whether any rule's player was seen at all
+    :rtype: tuple[list[tuple[FarmRule, tuple, tuple]], bool]
+    """
+
+    matches = []
+    if count == 0: return matches, False
+
+    # Lower-case every line once, top to bottom
+    order = np.argsort(boxes[:count, 1], kind="stable")
+    lines = [texts[idx].lower().strip() for idx in order]
+    player_seen = any(player in line for line in lines if RuleSet._DISCORD_COMMAND_TEXT not in line for player in self.players) # Embeds only, not command headers
+
+    # Search bottom-up: the first button found for a rule belongs to its newest embed
+    pending = {rule for rule in self.rules if rule.isReady(now)}
+    for j in range(count - 1, -1, -1):
+      if not pending: break
+
+      candidates = self.by_button.get(lines[j])
+      if not candidates: continue
+
+      btn_box = boxes[order[j]]
+      for rule in candidates:
+        if rule not in pending: continue
+
+        name_index = self._findEmbedName(rule, lines, boxes, order, j)
+        if name_index >= 0:
+          pending.discard(rule)
+          matches.append((rule, tuple(int(v) for v in btn_box), tuple(int(v) for v in boxes[order[name_index]])))
+          break # One rule per button
+
+    return matches, player_seen
+
+
+  def evaluateButtons(self, hits: list, anchors: dict, now: float) -> list[tuple[FarmRule, tuple, tuple]]:
+    """
+    Degraded matching from button hits alone (no player names were read).
+    Every embed's buttons sit in the same column, so a hit is only accepted
+    where the rule's button was last matched; anything else may belong to
+    another player and is not clicked.
+
+    :param hits: List of (box, label, score), e.g. from TemplateBackend.readText()
+    :type hits: list
+    :param anchors: Rule key -> (name box, button box) of its last full match
+    :type anchors: dict
+    :param now: Current time, for cooldowns
+    :type now: float
+    :return: List of (rule, button box, name box) to click
+    :rtype: list[tuple[FarmRule, tuple, tuple]]
+    """
+
+    matches = []
+    for rule in self.rules:
+      anchor = anchors.get(rule.key())
+      if anchor is None or not rule.isReady(now): continue
+
+      name_box, last_box = anchor
+      near = [
+        box for box, label, _ in hits
+        if label == rule.button
+        and abs((box[0] + box[2]) - (last_box[0] + last_box[2])) / 2 <= RuleSet._MAX_BUTTON_DRIFT
+        and abs((box[1] + box[3]) - (last_box[1] + last_box[3])) / 2 <= RuleSet._MAX_BUTTON_DRIFT
+      ]
+      if near: matches.append((rule, min(near, key=lambda box: abs((box[1] + box[3]) - (last_box[1] + last_box[3]))), name_box))
+    return matches
+
+
+  # ================ Private Functions ================
+
+  def _findEmbedName(self, rule: FarmRule, lines: list[str], boxes, order, button_index: int) -> int:
+    """
+    Checks whether the button at `button_index` sits under an embed for the rule's player.
+    The search stops at the first embed boundary (a slash command header, another
+    player's name, or a button row above the current one), so a button is never
+    paired with the name of an older embed.
+
+    :return: Index (into `lines`) of the player name above the button, or -1 if the rule does not match
+    :rtype: int
+    """
+
+    btn_box = boxes[order[button_index]]
+    btn_x_center = (btn_box[0] + btn_box[2]) / 2
+    text_found = not rule.text
+    in_button_row = True # Buttons of the same embed can sit next to or above this one
+
+    # Look UP for the player name, inside the embed area
+    for i in range(button_index - 1, -1, -1):
+      line = lines[i]
+      box = boxes[order[i]]
+      if (btn_box[1] - box[1]) > RuleSet._MAX_VERTICAL_GAP:
+        return -1
+
+      # Embed boundaries
+      if RuleSet._DISCORD_COMMAND_TEXT in line:
+        return -1
+      if line in self.by_button:
+        if in_button_row: continue
+        return -1
+      in_button_row = False
+      if rule.player not in line and any(player in line for player in self.players):
+        return -1
+
+      if rule.text and rule.text in line:
+        text_found = True
+
+      if rule.player not in line:
+        continue
+
+      # Only accept if the name is horizontally aligned with the button
+      player_x_center = (box[0] + box[2]) / 2
+      if abs(btn_x_center - player_x_center) < RuleSet._MAX_HORIZONTAL_OFFSET:
+        return i if text_found or rule.text in line else -1
+
+    return -1
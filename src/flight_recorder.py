@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import queue
+import shutil
+import threading
+from collections import deque
+
+import cv2
+
+from src.logger import Logger
+
+
+class FlightRecorder:
+  """
+  FlightRecorder Class
+
+  **Purpose:**
+    Keeps the most recent captured crops, their OCR results and the decisions
+    made on them in a bounded in-memory ring buffer, so a miss or overrun can
+    be inspected after the fact without writing every frame to disk.
+
+  **Usage:**
+    Call `record()` once per cycle and `dump()` when something went wrong.
+    Automatic dumps only write the records added since the previous dump,
+    and the oldest dump directories are deleted to stay under a disk budget.
+    `record()` only copies the crop; a background thread PNG-compresses it,
+    and the oldest records are evicted once the byte budget is exceeded.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "FlightRecorder"
+
+  RECORDS_FILENAME = "records.jsonl" # One JSON record per line, oldest first
+  _FRAME_FILENAME = "frame_{:05d}.png"
+  _PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1] # Favour speed, text crops compress well regardless
+
+
+  # ================ Constructors ================
+
+  def __init__(self, dump_dir: str, max_bytes: int = 64 * 1024 * 1024, min_dump_interval: float = 30.0, max_disk_bytes: int = 512 * 1024 * 1024):
+    """
+    Initialize a new FlightRecorder
+
+    :param dump_dir: Directory that dumps are written into
+    :type dump_dir: str
+    :param max_bytes: Memory budget for the stored frames
+    :type max_bytes: int
+    :param min_dump_interval: Minimum seconds between two automatic dumps
+    :type min_dump_interval: float
+    :param max_disk_bytes: Disk budget for all dumps in `dump_dir`, oldest dumps are deleted beyond it
+    :type max_disk_bytes: int
+    """
+
+    self.dump_dir = dump_dir
+    self.max_bytes = max_bytes
+    self.min_dump_interval = min_dump_interval
+    self.max_disk_bytes = max_disk_bytes
+
+    self._records = deque() # [entry, frame, seq], frame is the raw crop until encoded, None once evicted
+    self._total_bytes = 0
+    self._last_dump_time = 0.0
+    self._seq = 0
+    self._dumped_seq = 0 # Records up to this one were already written by an earlier dump
+    self._lock = threading.Lock()
+
+    self._pending = queue.SimpleQueue()
+    self._encoder = threading.Thread(target=self._encodeLoop, name="recorder", daemon=True)
+    self._encoder.start()
+
+
+  # ================ Public Functions ================
+
+  def __len__(self) -> int: return len(self._records)
+
+  def totalBytes(self) -> int: return self._total_bytes
+
+
+  def record(self, crop, offset: tuple[int, int], window_size: tuple[int, int], detections, decision: dict):
+    """
+    Store a captured crop together with what was read from it and what was done
+
+    :param crop: Cropped cv2 image handed to OCR
+    :param offset: (left, top) of the crop inside the full screenshot
+    :type offset: tuple[int, int]
+    :param window_size: (width, height) of the full screenshot
+    :type window_size: tuple[int, int]
+    :param detections: Iterable of (text, box) found, in screenshot coordinates
+    :param decision: What the bot decided to do with this frame
+    :type decision: dict
+    """
+
+    # Copy only, the crop is a view into a buffer the next capture overwrites
+    frame = crop.copy()
+
+    entry = {
+      "time": time.time(),
+      "offset": [int(offset[0]), int(offset[1])],
+      "window_size": [int(window_size[0]), int(window_size[1])],
+      "detections": [[text, [int(v) for v in box]] for text, box in detections],
+      "decision": decision,
+    }
+
+    with self._lock:
+      self._seq += 1
+      record = [entry, frame, self._seq]
+      self._records.append(record)
+      self._total_bytes += frame.nbytes
+      self._evict()
+    self._pending.put(record)
+
+
+  def dump(self, reason: str, force: bool = False) -> str | None:
+    """
+    Write the buffered records to a new directory in the background
+
+    :param reason: Why the dump was triggered (used in the directory name)
+    :type reason: str
+    :param force: Manual trigger: ignore the minimum interval, and write the whole buffer instead of only the new records
+    :type force: bool
+    :return: Directory the dump is written to, or None if skipped
+    :rtype: str | None
+    """
+
+    now = time.time()
+    with self._lock:
+      if not self._records: return None
+      if not force and now - self._last_dump_time < self.min_dump_interval: return None
+      snapshot = [(entry, frame) for entry, frame, seq in self._records if force or seq > self._dumped_seq]
+      if not snapshot: return None
+      self._last_dump_time = now
+      self._dumped_seq = self._seq
+
+    stamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(now))
+    path = os.path.join(self.dump_dir, f"{stamp}_{reason}")
+    threading.Thread(target=self._writeDump, args=(path, snapshot), daemon=True).start()
+    return path
+
+
+  # ================ Private Functions ================
+
+  def _evict(self):
+    """
+    Drop the oldest records until back under budget, but always keep the newest one (lock held)
+    """
+
+    while self._total_bytes > self.max_bytes and len(self._records) > 1:
+      old = self._records.popleft()
+      self._total_bytes -= self._frameBytes(old[1])
+      old[1] = None # Tells the encoder not to bother
+
+
+  def _encodeLoop(self):
+    """
+    Encoder thread: replaces raw crops with their PNG, off the farm thread
+    """
+
+    while True:
+      record = self._pending.get()
+      raw = record[1]
+      if raw is None: continue
+
+      frame = self._encode(raw)
+      with self._lock:
+        if record[1] is not raw or frame is None: continue # Evicted meanwhile
+        record[1] = frame
+        self._total_bytes += len(frame) - raw.nbytes
+        self._evict()
+
+
+  @staticmethod
+  def _encode(raw) -> bytes | None:
+    ok, encoded = cv2.imencode(".png", raw, FlightRecorder._PNG_PARAMS)
+    return encoded.tobytes() if ok else None
+
+
+  @staticmethod
+  def _frameBytes(frame) -> int: return len(frame) if isinstance(frame, bytes) else frame.nbytes
+
+
+  def _pruneDumps(self, incoming: int):
+    """
+    Deletes the oldest dump directories until `incoming` more bytes fit in the disk budget
+
+    :param incoming: Size of the dump about to be written (upper bound)
+    :type incoming: int
+    """
+
+    if not os.path.isdir(self.dump_dir): return
+
+    dumps = []
+    for name in sorted(os.listdir(self.dump_dir)): # Names start with the time stamp, oldest first
+      path = os.path.join(self.dump_dir, name)
+      if not os.path.isdir(path): continue
+      size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+      dumps.append((path, size))
+
+    total = sum(size for _, size in dumps)
+    for path, size in dumps:
+      if total + incoming <= self.max_disk_bytes: break
+      shutil.rmtree(path, ignore_errors=True)
+      total -= size
+      Logger.log(FlightRecorder._LOG_HEADER, f"Deleted old dump '{path}' to stay under {self.max_disk_bytes / (1024 * 1024):.0f}MB")
+
+
+  def _writeDump(self, path: str, snapshot: list):
+    """
+    Writes a snapshot of the ring buffer to disk
+
+    :param path: Directory to write into
+    :type path: str
+    :param snapshot: List of (entry, png bytes or raw crop not encoded yet)
+    :type snapshot: list
+    """
+
+    try:
+      self._pruneDumps(sum(self._frameBytes(frame) for _, frame in snapshot))
+      os.makedirs(path, exist_ok=True)
+      with open(os.path.join(path, FlightRecorder.RECORDS_FILENAME), "w", encoding="utf-8") as records_file:
+        for i, (entry, frame) in enumerate(snapshot):
+          if not isinstance(frame, bytes): frame = self._encode(frame)
+          if frame is None: continue
+
+          frame_name = FlightRecorder._FRAME_FILENAME.format(i)
+          with open(os.path.join(path, frame_name), "wb") as frame_file:
+            frame_file.write(frame)
+          records_file.write(json.dumps({"frame": frame_name, **entry}) + "\n")
+
+      Logger.log(FlightRecorder._LOG_HEADER, f"Dumped {len(snapshot)} records to '{path}'")
+    except OSError as e:
+      Logger.log(FlightRecorder._LOG_HEADER, f"ERROR: Failed to dump records to '{path}': {e}")
@@ -0,0 +1,504 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import platform
+
+import cv2
+import numpy as np
+
+from src.logger import Logger
+
+# Optional backends, only offered when their packages are installed
+try:
+  from rapidocr_onnxruntime import RapidOCR
+except ImportError:
+  RapidOCR = None
+
+try:
+  import pytesseract
+except ImportError:
+  pytesseract = None
+
+
+class OcrBackend:
+  """
+  OcrBackend Class
+
+  **Purpose:**
+    Interface every OCR engine implements, so ElementDetector does not
+    depend on one specific library.
+
+  **Usage:**
+    Subclasses implement `detect()` and `recognize()`, and may override
+    `readText()` when the library has a faster combined pipeline.
+    Boxes are always axis-aligned (x_min, y_min, x_max, y_max) tuples.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  name: str = ""
+  split_pipeline: bool = True # detect() is much cheaper than readText(), so recognition can be skipped per line
+
+
+  # ================ Public Functions ================
+
+  @classmethod
+  def isAvailable(cls) -> bool: return True
+
+
+  def clone(self, threads: int) -> "OcrBackend":
+    """
+    Get an instance for one worker of a parallel pool
+
+    :param threads: Compute threads the instance may use
+    :type threads: int
+    :return: Independent instance, or self if the backend is safe to share
+    :rtype: OcrBackend
+    """
+
+    return self
+
+
+  def warmUp(self):
+    """
+    Run the models once so the first real frame does not pay for lazy initialization
+    """
+
+    self.readText(np.full((64, 256, 3), 255, dtype=np.uint8))
+
+
+  def detect(self, img) -> list[tuple[int, int, int, int]]:
+    """
+    Find the text lines in an image
+
+    :param img: cv2 image
+    :return: Box of every text line
+    :rtype: list[tuple[int, int, int, int]]
+    """
+
+    raise NotImplementedError
+
+
+  def recognize(self, img, boxes: list[tuple[int, int, int, int]]) -> list[tuple[str, float]]:
+    """
+    Read the text inside the given boxes
+
+    :param img: cv2 image the boxes refer to
+    :param boxes: Boxes to read
+    :type boxes: list[tuple[int, int, int, int]]
+    :return: (text, score) per box, in the same order
+    :rtype: list[tuple[str, float]]
+    """
+
+    raise NotImplementedError
+
+
+  def readText(self, img) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Detect and recognize all text in an image
+
+    :param img: cv2 image
+    :return: List of (box, text, score)
+    :rtype: list[tuple[tuple[int, int, int, int], str, float]]
+    """
+
+    boxes = self.detect(img)
+    if not boxes: return []
+    return [(box, text, score) for box, (text, score) in zip(boxes, self.recognize(img, boxes))]
+
+
+  # ================ Helper Functions ================
+
+  @staticmethod
+  def _quadToBox(points) -> tuple[int, int, int, int]:
+    """
+    Convert a 4-point polygon into an axis-aligned box
+    """
+
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = points
+    return (
+      int(min(x1, x2, x3, x4)), int(min(y1, y2, y3, y4)),
+      int(max(x1, x2, x3, x4)), int(max(y1, y2, y3, y4))
+    )
+
+
+  @staticmethod
+  def cropBox(img, box: tuple[int, int, int, int]):
+    """
+    Crop a box out of an image, clamped to the image bounds
+
+    :param img: cv2 image
+    :param box: x_min, y_min, x_max, y_max
+    :type box: tuple[int, int, int, int]
+    :return: View of the box inside the image
+    """
+
+    height, width = img.shape[:2]
+    x_min, y_min, x_max, y_max = box
+    return img[max(0, y_min):min(height, y_max), max(0, x_min):min(width, x_max)]
+
+
+class RapidOcrBackend(OcrBackend):
+  """
+  RapidOCR (ONNX Runtime) backend, the default
+  """
+
+  name = "rapidocr"
+
+  @classmethod
+  def isAvailable(cls) -> bool: return RapidOCR is not None
+
+
+  def __init__(self, **kwargs):
+    """
+    :param kwargs: Passed on to RapidOCR, e.g. intra_op_num_threads
+    """
+
+    self.kwargs = kwargs
+    self.engine = RapidOCR(**kwargs)
+
+
+  def clone(self, threads: int) -> OcrBackend:
+    # Own ONNX sessions per worker, so the pool does not oversubscribe the cores
+    return RapidOcrBackend(**{**self.kwargs, "intra_op_num_threads": threads, "inter_op_num_threads": 1})
+
+
+  def detect(self, img) -> list[tuple[int, int, int, int]]:
+    result, _ = self.engine(img, use_det=True, use_cls=False, use_rec=False)
+    if result is None: return []
+    return [OcrBackend._quadToBox(points) for points in result]
+
+
+  def recognize(self, img, boxes: list[tuple[int, int, int, int]]) -> list[tuple[str, float]]:
+    if not boxes: return []
+    crops = [OcrBackend.cropBox(img, box) for box in boxes]
+    rec_res, _ = self.engine.text_rec(crops) # Batched, one call for all boxes
+    return [(text, float(score)) for text, score in rec_res]
+
+
+  def readText(self, img) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    # Returns: [result, elapsed_time]
+    result, _ = self.engine(img)
+    if result is None: return []
+
+    # Line structure ==> [ [[x1,y1],[x2,y2],[x3,y3],[x4,y4]], text, confidence ]
+    return [(OcrBackend._quadToBox(points), text, float(score)) for points, text, score in result]
+
+
+class TesseractBackend(OcrBackend):
+  """
+  Local Tesseract binary through pytesseract
+  """
+
+  name = "tesseract"
+  split_pipeline = False # Detection already reads the text
+
+  _LINE_CONFIG = "--psm 7" # Treat each crop as a single text line
+
+  @classmethod
+  def isAvailable(cls) -> bool:
+    if pytesseract is None: return False
+    try:
+      pytesseract.get_tesseract_version()
+      return True
+    except (pytesseract.TesseractNotFoundError, OSError):
+      return False
+
+
+  def detect(self, img) -> list[tuple[int, int, int, int]]:
+    return [box for box, _, _ in self.readText(img)]
+
+
+  def recognize(self, img, boxes: list[tuple[int, int, int, int]]) -> list[tuple[str, float]]:
+    ret = []
+    for box in boxes:
+      lines = self._readLines(OcrBackend.cropBox(img, box), TesseractBackend._LINE_CONFIG)
+      ret.append((" ".join(text for _, text, _ in lines), min((score for _, _, score in lines), default=0.0)))
+    return ret
+
+
+  def readText(self, img) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    return self._readLines(img, "")
+
+
+  def _readLines(self, img, config: str) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    """
+    Run Tesseract and group its words into lines
+    """
+
+    data = pytesseract.image_to_data(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), config=config, output_type=pytesseract.Output.DICT)
+
+    lines = {}
+    for i, word in enumerate(data["text"]):
+      score = float(data["conf"][i])
+      if not word.strip() or score < 0: continue
+
+      key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+      box = (data["left"][i], data["top"][i], data["left"][i] + data["width"][i], data["top"][i] + data["height"][i])
+      if key not in lines:
+        lines[key] = [list(box), [word], [score]]
+      else:
+        line = lines[key]
+        line[0] = [min(line[0][0], box[0]), min(line[0][1], box[1]), max(line[0][2], box[2]), max(line[0][3], box[3])]
+        line[1].append(word)
+        line[2].append(score)
+
+    return [(tuple(box), " ".join(words), min(scores) / 100) for box, words, scores in lines.values()]
+
+
+class TemplateBackend(OcrBackend):
+  """
+  Pure template matcher for a small vocabulary of fixed labels (button text).
+  Fast, but it cannot read anything outside its templates (player names), so
+  it is never selected as the main backend, only used to find known buttons.
+  """
+
+  name = "template"
+  split_pipeline = False # Detection already reads the text
+
+  _MATCH_THRESHOLD = 0.85 # Normalized correlation needed to accept a hit
+
+
+  def __init__(self, templates: dict[str, list] | None = None):
+    """
+    :param templates: Label -> list of cv2 images of that label
+    :type templates: dict[str, list] | None
+    """
+
+    self.templates: dict[str, list] = {}
+    for label, images in (templates or {}).items():
+      for image in images: self.addTemplate(label, image)
+
+
+  def addTemplate(self, label: str, img):
+    """
+    Teach the matcher one more example of a label
+
+    :param label: Text shown in the image
+    :type label: str
+    :param img: cv2 image of just the label
+    """
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    self.templates.setdefault(label, []).append(gray)
+
+
+  @classmethod
+  def fromSamples(cls, samples: list, vocabulary: set[str]) -> "TemplateBackend":
+    """
+    Cut templates for the given labels out of labelled sample frames
+
+    :param samples: Samples as returned by BackendSelector.loadSamples()
+    :type samples: list
+    :param vocabulary: Labels to learn (lower-case)
+    :type vocabulary: set[str]
+    :return: New backend
+    :rtype: TemplateBackend
+    """
+
+    backend = cls()
+    for img, expected in samples:
+      for text, box in expected:
+        if text in vocabulary: backend.addTemplate(text, OcrBackend.cropBox(img, box))
+    return backend
+
+
+  def detect(self, img) -> list[tuple[int, int, int, int]]:
+    return [box for box, _, _ in self.readText(img)]
+
+
+  def recognize(self, img, boxes: list[tuple[int, int, int, int]]) -> list[tuple[str, float]]:
+    ret = []
+    for box in boxes:
+      crop = OcrBackend.cropBox(img, box)
+      gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+      best_label, best_score = "", 0.0
+      for label, templates in self.templates.items():
+        for template in templates:
+          if gray.shape[0] < 2 or gray.shape[1] < 2: continue
+          resized = cv2.resize(template, (gray.shape[1], gray.shape[0]), interpolation=cv2.INTER_AREA)
+          score = float(cv2.matchTemplate(gray, resized, cv2.TM_CCOEFF_NORMED)[0, 0])
+          if score > best_score: best_label, best_score = label, score
+      ret.append((best_label, best_score) if best_score >= TemplateBackend._MATCH_THRESHOLD else ("", best_score))
+    return ret
+
+
+  def readText(self, img) -> list[tuple[tuple[int, int, int, int], str, float]]:
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+    hits = []
+    for label, templates in self.templates.items():
+      for template in templates:
+        t_height, t_width = template.shape[:2]
+        if t_height > gray.shape[0] or t_width > gray.shape[1]: continue
+
+        scores = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+        ys, xs = np.where(scores >= TemplateBackend._MATCH_THRESHOLD)
+        for x, y in zip(xs, ys):
+          hits.append(((int(x), int(y), int(x) + t_width, int(y) + t_height), label, float(scores[y, x])))
+
+    # Keep only the best hit among overlapping ones
+    hits.sort(key=lambda hit: hit[2], reverse=True)
+    kept = []
+    for hit in hits:
+      if all(not TemplateBackend._overlaps(hit[0], other[0]) for other in kept):
+        kept.append(hit)
+    return kept
+
+
+  @staticmethod
+  def _overlaps(a: tuple, b: tuple) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class BackendSelector:
+  """
+  BackendSelector Class
+
+  **Purpose:**
+    Picks the fastest available OCR backend that still reads the labelled
+    sample frames accurately enough, and remembers the choice per host.
+
+  **Usage:**
+    Put sample frames in a directory as `<name>.png` + `<name>.json`, where
+    the JSON holds a list of {"text": ..., "box": [x_min, y_min, x_max, y_max]}.
+    Then call `BackendSelector.select(samples_dir, cache_path)`.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "BackendSelector"
+
+  BACKENDS = [RapidOcrBackend, TesseractBackend] # Default first, general readers only (see TemplateBackend)
+
+
+  # ================ Public Functions ================
+
+  @classmethod
+  def loadSamples(cls, samples_dir: str) -> list:
+    """
+    Load labelled sample frames
+
+    :param samples_dir: Directory with <name>.png + <name>.json pairs
+    :type samples_dir: str
+    :return: List of (cv2 image, [(lower-case text, box), ...])
+    :rtype: list
+    """
+
+    samples = []
+    for image_path in sorted(glob.glob(os.path.join(samples_dir, "*.png"))):
+      label_path = os.path.splitext(image_path)[0] + ".json"
+      img = cv2.imread(image_path)
+      if img is None or not os.path.isfile(label_path): continue
+
+      with open(label_path, encoding="utf-8") as file:
+        expected = [(entry["text"].lower().strip(), tuple(entry["box"])) for entry in json.load(file)]
+      samples.append((img, expected))
+    return samples
+
+
+  @classmethod
+  def benchmark(cls, backend: OcrBackend, samples: list) -> tuple[float, float]:
+    """
+    Measure how accurately and how fast a backend reads the samples
+
+    :param backend: Backend to measure
+    :type backend: OcrBackend
+    :param samples: Samples from loadSamples()
+    :type samples: list
+    :return: (fraction of expected lines read exactly, mean seconds per frame)
+    :rtype: tuple[float, float]
+    """
+
+    backend.warmUp()
+
+    found = total = 0
+    start = time.perf_counter()
+    for img, expected in samples:
+      read = {text.lower().strip() for _, text, _ in backend.readText(img)}
+      found += sum(1 for text, _ in expected if text in read)
+      total += len(expected)
+    elapsed = time.perf_counter() - start
+
+    return (found / total if total else 0.0), elapsed / max(1, len(samples))
+
+
+  @classmethod
+  def select(cls, samples_dir: str, cache_path: str, min_accuracy: float = 0.9) -> OcrBackend:
+    """
+    Pick the fastest backend meeting the accuracy threshold
+
+    :param samples_dir: Directory with labelled sample frames
+    :type samples_dir: str
+    :param cache_path: JSON file the selection is cached in
+    :type cache_path: str
+    :param min_accuracy: Minimum fraction of expected lines a backend must read
+    :type min_accuracy: float
+    :return: Ready to use backend
+    :rtype: OcrBackend
+    """
+
+    samples = cls.loadSamples(samples_dir) if os.path.isdir(samples_dir) else []
+    available = [backend for backend in cls.BACKENDS if backend.isAvailable()]
+    if not samples:
+      Logger.log(cls._LOG_HEADER, f"No samples in '{samples_dir}', using {available[0].name}")
+      return available[0]()
+
+    # Reuse the cached selection if nothing relevant changed
+    key = cls._cacheKey(samples_dir, available, min_accuracy)
+    cached = cls._loadCache(cache_path)
+    if cached.get("key") == key:
+      for backend in available:
+        if backend.name == cached.get("backend"):
+          Logger.log(cls._LOG_HEADER, f"Using cached selection: {backend.name}")
+          return backend()
+
+    # Benchmark everything and keep the fastest accurate one
+    best, best_time = None, float("inf")
+    for backend_cls in available:
+      backend = backend_cls()
+      accuracy, seconds = cls.benchmark(backend, samples)
+      Logger.log(cls._LOG_HEADER, f"{backend.name}: accuracy={accuracy:.2%} | {seconds * 1000:.1f}ms/frame")
+      if accuracy >= min_accuracy and seconds < best_time:
+        best, best_time = backend, seconds
+
+    if best is None:
+      Logger.log(cls._LOG_HEADER, f"No backend reached {min_accuracy:.0%} accuracy, using {available[0].name}")
+      return available[0]()
+
+    Logger.log(cls._LOG_HEADER, f"Selected {best.name}")
+    try:
+      with open(cache_path, "w", encoding="utf-8") as file:
+        json.dump({"key": key, "backend": best.name}, file)
+    except OSError as e:
+      Logger.log(cls._LOG_HEADER, f"ERROR: Could not cache selection: {e}")
+    return best
+
+
+  # ================ Private Functions ================
+
+  @classmethod
+  def _cacheKey(cls, samples_dir: str, available: list, min_accuracy: float) -> str:
+    """
+    Identify the host, the available backends and the sample set
+    """
+
+    digest = hashlib.sha1()
+    digest.update(f"{platform.node()}|{platform.processor()}|{os.cpu_count()}|{min_accuracy}".encode())
+    digest.update("|".join(backend.name for backend in available).encode())
+    for path in sorted(glob.glob(os.path.join(samples_dir, "*"))):
+      digest.update(f"{os.path.basename(path)}:{os.path.getsize(path)}:{os.path.getmtime(path)}".encode())
+    return digest.hexdigest()
+
+
+  @classmethod
+  def _loadCache(cls, cache_path: str) -> dict:
+    try:
+      with open(cache_path, encoding="utf-8") as file:
+        return json.load(file)
+    except (OSError, ValueError):
+      return {}
@@ -0,0 +1,177 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+
+from src.logger import Logger
+
+
+class RecognitionCache:
+  """
+  RecognitionCache Class
+
+  **Purpose:**
+    Remembers what each text-line crop was recognised as, keyed on a hash of
+    its normalised pixels, so lines that repeat every cycle (player names,
+    button labels, embed titles) skip the recognition model.
+
+  **Usage:**
+    `key = cache.key(crop)`, then `cache.get(key)` / `cache.put(key, (text, score))`.
+    Bounded by entry count and bytes (LRU eviction). Call `save()` to write
+    the persistent tier and `load()` to start warm after a restart.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "RecognitionCache"
+
+  _NORM_HEIGHT = 24 # Every crop is scaled to this height before hashing
+  _WIDTH_BUCKET = 8 # px, normalised width is rounded up to a multiple of this
+  _QUANT_SHIFT = 3 # Drop the low bits of each pixel so anti-aliasing noise does not change the key
+  _ENTRY_OVERHEAD = 96 # Rough bytes of bookkeeping per entry
+
+
+  # ================ Constructors ================
+
+  def __init__(self, max_entries: int = 4096, max_bytes: int = 1024 * 1024, persist_path: str = ""):
+    """
+    Initialize a new RecognitionCache
+
+    :param max_entries: Maximum number of remembered lines
+    :type max_entries: int
+    :param max_bytes: Maximum approximate memory used by the entries
+    :type max_bytes: int
+    :param persist_path: JSON file for the on-disk tier, disabled if empty
+    :type persist_path: str
+    """
+
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.persist_path = persist_path
+
+    self.hits = 0
+    self.misses = 0
+
+    self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+    self._bytes = 0
+    self._lock = threading.Lock()
+
+
+  # ================ Public Functions ================
+
+  def __len__(self) -> int: return len(self._entries)
+
+  def hitRate(self) -> float:
+    total = self.hits + self.misses
+    return self.hits / total if total else 0.0
+
+
+  @classmethod
+  def key(cls, crop) -> bytes:
+    """
+    Content hash of a line crop (size-bucketed, quantised grayscale)
+
+    :param crop: cv2 image of one text line
+    :return: Cache key
+    :rtype: bytes
+    """
+
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    height, width = gray.shape[:2]
+    norm_width = max(1, round(width * cls._NORM_HEIGHT / max(1, height)))
+    norm_width += -norm_width % cls._WIDTH_BUCKET
+    norm = cv2.resize(gray, (norm_width, cls._NORM_HEIGHT), interpolation=cv2.INTER_AREA) >> cls._QUANT_SHIFT
+
+    digest = hashlib.blake2b(norm.tobytes(), digest_size=16)
+    digest.update(norm_width.to_bytes(4, "little"))
+    return digest.digest()
+
+
+  def get(self, key: bytes) -> tuple[str, float] | None:
+    """
+    Look up a line, counting the hit or miss
+
+    :param key: Key from `key()`
+    :type key: bytes
+    :return: Cached (text, score), or None
+    :rtype: tuple[str, float] | None
+    """
+
+    with self._lock:
+      value = self._entries.get(key)
+      if value is None:
+        self.misses += 1
+        return None
+
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return value
+
+
+  def put(self, key: bytes, value: tuple[str, float]):
+    """
+    Remember a recognised line, evicting the least recently used ones if over budget
+
+    :param key: Key from `key()`
+    :type key: bytes
+    :param value: (text, score)
+    :type value: tuple[str, float]
+    """
+
+    with self._lock:
+      old = self._entries.pop(key, None)
+      if old is not None: self._bytes -= self._entrySize(key, old)
+
+      self._entries[key] = value
+      self._bytes += self._entrySize(key, value)
+
+      while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+        old_key, old_value = self._entries.popitem(last=False)
+        self._bytes -= self._entrySize(old_key, old_value)
+
+
+  def load(self):
+    """
+    Fill the cache from the on-disk tier, if there is one
+    """
+
+    if not self.persist_path or not os.path.isfile(self.persist_path): return
+
+    try:
+      with open(self.persist_path, encoding="utf-8") as file:
+        for hex_key, (text, score) in json.load(file).items():
+          self.put(bytes.fromhex(hex_key), (text, float(score)))
+      Logger.log(RecognitionCache._LOG_HEADER, f"Loaded {len(self)} lines from '{self.persist_path}'")
+    except (OSError, ValueError) as e:
+      Logger.log(RecognitionCache._LOG_HEADER, f"ERROR: Could not load '{self.persist_path}': {e}")
+
+
+  def save(self):
+    """
+    Write the cache to the on-disk tier, oldest entries first so LRU order survives a reload
+    """
+
+    if not self.persist_path: return
+
+    with self._lock:
+      data = {key.hex(): list(value) for key, value in self._entries.items()}
+
+    try:
+      tmp_path = self.persist_path + ".tmp"
+      with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+      os.replace(tmp_path, self.persist_path)
+      Logger.log(RecognitionCache._LOG_HEADER, f"Saved {len(data)} lines | Hit rate={self.hitRate():.1%}")
+    except OSError as e:
+      Logger.log(RecognitionCache._LOG_HEADER, f"ERROR: Could not save '{self.persist_path}': {e}")
+
+
+  # ================ Private Functions ================
+
+  @staticmethod
+  def _entrySize(key: bytes, value: tuple[str, float]) -> int:
+    return len(key) + len(value[0].encode("utf-8")) + RecognitionCache._ENTRY_OVERHEAD
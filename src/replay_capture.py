@@ -0,0 +1,81 @@
+import os
+import json
+
+import cv2
+import numpy as np
+
+from src.logger import Logger
+from src.flight_recorder import FlightRecorder
+
+
+class ReplayCapture:
+  """
+  ReplayCapture Class
+
+  **Purpose:**
+    Capture source that plays back frames dumped by the FlightRecorder, so
+    the farm loop can run without Discord or Windows.
+
+  **Usage:**
+    Pass it to FarmEngine in place of a WindowManager. Each call to
+    `getWindowTextureFromHwnd()` returns the next recorded frame, looping
+    back to the first one at the end.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "ReplayCapture"
+
+
+  # ================ Constructors ================
+
+  def __init__(self, dump_path: str):
+    """
+    Load a flight recorder dump
+
+    :param dump_path: Directory written by FlightRecorder.dump()
+    :type dump_path: str
+    """
+
+    # Decode every crop once up front, replaying must not cost decode time
+    self.frames = []
+    with open(os.path.join(dump_path, FlightRecorder.RECORDS_FILENAME), encoding="utf-8") as records_file:
+      for line in records_file:
+        entry = json.loads(line)
+        crop = cv2.imread(os.path.join(dump_path, entry["frame"]))
+        if crop is None: continue
+        width, height = entry["window_size"]
+        self.frames.append((crop, tuple(entry["offset"]), (height, width, 3)))
+
+    if not self.frames:
+      raise ValueError(f"No frames found in '{dump_path}'")
+
+    self.index = 0
+    Logger.log(ReplayCapture._LOG_HEADER, f"Loaded {len(self.frames)} frames from '{dump_path}'")
+
+
+  # ================ Public Functions ================
+
+  def __len__(self) -> int: return len(self.frames)
+
+
+  def getWindowTextureFromHwnd(self, hwnd: int, out=None):
+    """
+    Returns the next recorded frame, pasted into a full window-sized image
+
+    :param hwnd: Ignored, kept for WindowManager compatibility
+    :type hwnd: int
+    :param out: Preallocated BGR buffer to write into, reused when the size matches
+    :return: cv2 image
+    """
+
+    crop, (left, top), shape = self.frames[self.index]
+    self.index = (self.index + 1) % len(self.frames)
+
+    if out is None or out.shape != shape:
+      out = np.zeros(shape, dtype=np.uint8)
+
+    crop_height, crop_width = crop.shape[:2]
+    out[top:top + crop_height, left:left + crop_width] = crop
+    return out
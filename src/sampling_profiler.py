@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+from src.logger import Logger
+
+
+class SamplingProfiler:
+  """
+  SamplingProfiler Class
+
+  **Purpose:**
+    Low-overhead stack sampler for the farm thread and the OCR worker
+    threads. Stacks are aggregated per cycle and written as collapsed-stack
+    files (one `frame;frame;frame count` line per stack) for cycles that
+    ran longer than a threshold, ready for flamegraph.pl / speedscope.
+
+  **Usage:**
+    `start(thread_id)` on the farm thread, `beginCycle()` / `endCycle(runtime)`
+    around each cycle, `stop()` when done.
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "SamplingProfiler"
+
+  _WORKER_PREFIX = "ocr" # Threads with this name prefix are sampled too (ElementDetector's pool)
+  _IDLE_WORKER_FRAME = ("_worker", os.path.join("concurrent", "futures", "thread.py")) # Innermost frame of a pool worker waiting for work
+
+
+  # ================ Constructors ================
+
+  def __init__(self, out_dir: str, threshold: float, interval: float = 0.01):
+    """
+    Initialize a new SamplingProfiler
+
+    :param out_dir: Directory the collapsed-stack files are written into
+    :type out_dir: str
+    :param threshold: Cycles running longer than this (s) are written out
+    :type threshold: float
+    :param interval: Time between two samples (s)
+    :type interval: float
+    """
+
+    self.out_dir = out_dir
+    self.threshold = threshold
+    self.interval = interval
+
+    self._target = None
+    self._stacks = Counter()
+    self._lock = threading.Lock()
+    self._stop_event = threading.Event()
+    self._thread = None
+
+
+  # ================ Public Functions ================
+
+  def start(self, thread_id: int):
+    """
+    Start sampling
+
+    :param thread_id: Ident of the farm thread
+    :type thread_id: int
+    """
+
+    self._target = thread_id
+    self._stop_event = threading.Event() # Fresh event, so a sampler from a previous run cannot be revived
+    self._thread = threading.Thread(target=self._sampleLoop, args=(self._stop_event,), name="profiler", daemon=True)
+    self._thread.start()
+    Logger.log(SamplingProfiler._LOG_HEADER, f"Sampling every {self.interval * 1000:.0f}ms, writing cycles over {self.threshold:.2f}s to '{self.out_dir}'")
+
+
+  def stop(self):
+    """
+    Stop sampling
+    """
+
+    self._stop_event.set()
+
+
+  def beginCycle(self):
+    """
+    Forget the samples of the previous cycle
+    """
+
+    with self._lock:
+      self._stacks.clear()
+
+
+  def endCycle(self, runtime: float, force: bool = False) -> str | None:
+    """
+    Write the cycle's stacks out if it was slow
+
+    :param runtime: How long the cycle took (s)
+    :type runtime: float
+    :param force: Write regardless of the threshold (e.g. the cycle overran its slot)
+    :type force: bool
+    :return: Path of the written file, or None
+    :rtype: str | None
+    """
+
+    if runtime < self.threshold and not force: return None
+
+    with self._lock:
+      stacks = list(self._stacks.items())
+    if not stacks: return None
+
+    stamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+    path = os.path.join(self.out_dir, f"cycle_{stamp}_{runtime * 1000:.0f}ms.folded")
+    try:
+      os.makedirs(self.out_dir, exist_ok=True)
+      with open(path, "w", encoding="utf-8") as file:
+        for stack, count in stacks:
+          file.write(f"{stack} {count}\n")
+    except OSError as e:
+      Logger.log(SamplingProfiler._LOG_HEADER, f"ERROR: Could not write '{path}': {e}")
+      return None
+
+    Logger.log(SamplingProfiler._LOG_HEADER, f"Slow cycle ({runtime:.2f}s), wrote {sum(count for _, count in stacks)} samples to '{path}'")
+    return path
+
+
+  # ================ Private Functions ================
+
+  def _sampleLoop(self, stop_event: threading.Event):
+    """
+    Sampler thread: records the current stack of every watched thread
+
+    :param stop_event: Event ending this sampler
+    :type stop_event: threading.Event
+    """
+
+    while not stop_event.wait(self.interval):
+      # Farm thread plus the OCR workers, looked up by name each time since the pool grows lazily
+      names = {thread.ident: thread.name for thread in threading.enumerate()}
+      watched = {ident for ident, name in names.items() if ident == self._target or name.startswith(SamplingProfiler._WORKER_PREFIX)}
+
+      samples = []
+      for ident, frame in sys._current_frames().items():
+        if ident not in watched: continue
+        if ident != self._target and self._isIdleWorker(frame): continue # Pool workers blocked on the queue say nothing about the cycle
+
+        stack = []
+        while frame is not None:
+          code = frame.f_code
+          stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+          frame = frame.f_back
+        stack.append(names.get(ident, str(ident)))
+        samples.append(";".join(reversed(stack)))
+
+      with self._lock:
+        self._stacks.update(samples)
+
+
+  @staticmethod
+  def _isIdleWorker(frame) -> bool:
+    name, path = SamplingProfiler._IDLE_WORKER_FRAME
+    return frame.f_code.co_name == name and frame.f_code.co_filename.endswith(path)
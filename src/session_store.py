@@ -0,0 +1,236 @@
+import sys
+import json
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+
+from src.logger import Logger
+
+
+class SessionStore:
+  """
+  SessionStore Class
+
+  **Purpose:**
+    Local SQLite store for per-cycle metrics and for state the bot learns
+    while running (window size, OCR calibration, cadence, rule cooldowns),
+    so a restart picks up where the last session left off.
+
+  **Usage:**
+    `recordCycle()` / `setState()` queue writes that a background thread
+    commits in batches, so the farm thread never waits on disk.
+    `getState()` reads synchronously (meant for startup).
+    Rollups: python -m src.session_store session.db [--days 7]
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "SessionStore"
+
+  _BATCH_SIZE = 64 # Writes per transaction at most
+  _FLUSH_INTERVAL = 5.0 # s, queued writes are committed at least this often
+  _STOP = object()
+
+  _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cycles (
+      time REAL NOT NULL,
+      runtime REAL NOT NULL,
+      clicked INTEGER NOT NULL,
+      skipped INTEGER NOT NULL,
+      stats TEXT
+    );
+    CREATE INDEX IF NOT EXISTS cycles_time ON cycles (time);
+    CREATE TABLE IF NOT EXISTS state (
+      key TEXT PRIMARY KEY,
+      value TEXT NOT NULL,
+      updated REAL NOT NULL
+    );
+  """
+
+
+  # ================ Constructors ================
+
+  def __init__(self, path: str):
+    """
+    Open (or create) a session store and start its writer thread
+
+    :param path: SQLite database file
+    :type path: str
+    """
+
+    self.path = path
+
+    # Schema is created up front, so reads work before the writer's first flush
+    with self._connect() as conn:
+      conn.executescript(SessionStore._SCHEMA)
+    conn.close()
+
+    self._queue = queue.SimpleQueue()
+    self._thread = threading.Thread(target=self._writeLoop, name="session-store", daemon=True)
+    self._thread.start()
+
+
+  # ================ Public Functions ================
+
+  def recordCycle(self, time_: float, runtime: float, clicked: bool, skipped: bool, stats: dict | None = None):
+    """
+    Queue one cycle's metrics
+
+    :param time_: When the cycle finished (epoch s)
+    :type time_: float
+    :param runtime: Cycle runtime (s)
+    :type runtime: float
+    :param clicked: Was anything clicked?
+    :type clicked: bool
+    :param skipped: Did the cycle overrun its slot?
+    :type skipped: bool
+    :param stats: Extra per-cycle stats (OCR counters, budget level, ...)
+    :type stats: dict | None
+    """
+
+    self._queue.put(("cycle", (time_, runtime, int(clicked), int(skipped), json.dumps(stats or {}))))
+
+
+  def setState(self, key: str, value):
+    """
+    Queue a learned-state value for persisting
+
+    :param key: State name
+    :type key: str
+    :param value: Any JSON-serializable value
+    """
+
+    self._queue.put(("state", (key, json.dumps(value), time.time())))
+
+
+  def getState(self, key: str, default=None):
+    """
+    Read a persisted state value
+
+    :param key: State name
+    :type key: str
+    :param default: Returned if the key was never stored
+    :return: Stored value or default
+    """
+
+    conn = self._connect()
+    try:
+      row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+    finally:
+      conn.close()
+    return json.loads(row[0]) if row else default
+
+
+  def close(self):
+    """
+    Commit everything still queued and stop the writer thread
+    """
+
+    self._queue.put(SessionStore._STOP)
+    self._thread.join(timeout=10)
+
+
+  def rollup(self, days: int) -> list[dict]:
+    """
+    Per-day latency and click-rate summary
+
+    :param days: How many days back to include
+    :type days: int
+    :return: One dict per day, oldest first
+    :rtype: list[dict]
+    """
+
+    since = time.time() - days * 86400
+    conn = self._connect()
+    try:
+      rows = conn.execute(
+        "SELECT date(time, 'unixepoch', 'localtime'), runtime, clicked, skipped FROM cycles WHERE time >= ? ORDER BY time",
+        (since,)
+      ).fetchall()
+    finally:
+      conn.close()
+
+    per_day: dict[str, list] = {}
+    for day, runtime, clicked, skipped in rows:
+      per_day.setdefault(day, []).append((runtime, clicked, skipped))
+
+    ret = []
+    for day, cycles in per_day.items():
+      runtimes = sorted(runtime for runtime, _, _ in cycles)
+      ret.append({
+        "day": day,
+        "cycles": len(cycles),
+        "clicks": sum(clicked for _, clicked, _ in cycles),
+        "click_rate": sum(clicked for _, clicked, _ in cycles) / len(cycles),
+        "skip_rate": sum(skipped for _, _, skipped in cycles) / len(cycles),
+        "p50": runtimes[len(runtimes) // 2],
+        "p95": runtimes[min(len(runtimes) - 1, int(len(runtimes) * 0.95))],
+        "max": runtimes[-1],
+      })
+    return ret
+
+
+  # ================ Private Functions ================
+
+  def _connect(self) -> sqlite3.Connection:
+    conn = sqlite3.connect(self.path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL") # Readers do not block the writer thread
+    return conn
+
+
+  def _writeLoop(self):
+    """
+    Writer thread: commits queued writes in batches
+    """
+
+    conn = self._connect()
+    cycles, states = [], {}
+    last_flush = time.time()
+    running = True
+    while running:
+      try:
+        item = self._queue.get(timeout=SessionStore._FLUSH_INTERVAL)
+      except queue.Empty:
+        item = None
+
+      if item is SessionStore._STOP:
+        running = False
+      elif item is not None:
+        kind, row = item
+        if kind == "cycle": cycles.append(row)
+        else: states[row[0]] = row # Only the latest value per key matters
+
+      # Commit when the batch is full, the interval passed, or on shutdown
+      pending = len(cycles) + len(states)
+      if pending and (not running or pending >= SessionStore._BATCH_SIZE or time.time() - last_flush >= SessionStore._FLUSH_INTERVAL):
+        try:
+          with conn:
+            conn.executemany("INSERT INTO cycles (time, runtime, clicked, skipped, stats) VALUES (?, ?, ?, ?, ?)", cycles)
+            conn.executemany("INSERT OR REPLACE INTO state (key, value, updated) VALUES (?, ?, ?)", list(states.values()))
+        except sqlite3.Error as e:
+          Logger.log(SessionStore._LOG_HEADER, f"ERROR: Failed to write {pending} rows: {e}")
+        cycles, states = [], {}
+        last_flush = time.time()
+
+    conn.close()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Latency and click-rate rollups from a session store.")
+  parser.add_argument("db", help="Session database file")
+  parser.add_argument("--days", type=int, default=7, help="Days to include")
+  args = parser.parse_args()
+
+  store = SessionStore(args.db)
+  days = store.rollup(args.days)
+  store.close()
+  if not days:
+    print(f"No cycles in the last {args.days} days.")
+    sys.exit(0)
+
+  print(f"{'Day':<12}{'Cycles':>8}{'Clicks':>8}{'Click %':>9}{'Skip %':>8}{'p50 (s)':>9}{'p95 (s)':>9}{'Max (s)':>9}")
+  for day in days:
+    print(f"{day['day']:<12}{day['cycles']:>8}{day['clicks']:>8}{day['click_rate']:>9.1%}{day['skip_rate']:>8.1%}{day['p50']:>9.2f}{day['p95']:>9.2f}{day['max']:>9.2f}")
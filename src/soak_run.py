@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import psutil
+
+from src.logger import Logger
+from src.event_bus import EventBus
+from src.farm_engine import FarmEngine
+from src.session_store import SessionStore
+from src.flight_recorder import FlightRecorder
+from src.farm_rules import FarmRule, RuleSet
+from src.replay_capture import ReplayCapture
+from src.element_detector import ElementDetector
+
+
+class _CountingClicker:
+  """
+  Click sink that only counts clicks
+  """
+
+  def __init__(self): self.clicks = 0
+  def click(self, pos: tuple[int, int], absolute: bool = False): self.clicks += 1
+
+
+class SoakTest:
+  """
+  SoakTest Class
+
+  **Purpose:**
+    Runs the farm loop against replayed frames for a simulated stretch of
+    time and checks that memory stays flat once warmed up. The engine gets
+    the same flight recorder, session store and event bus App attaches,
+    each writing into a scratch directory.
+
+  **Usage:**
+    python -m src.soak_run <flight record dump> --player <name> [--hours 24]
+  ----------
+  """
+
+  # ==================== Variables ====================
+
+  _LOG_HEADER: str = "SoakTest"
+
+  _MB = 1024 * 1024
+
+
+  # ================ Constructors ================
+
+  def __init__(self, dump_path: str, player: str, hours: float = 24.0, lower_bound: float = 2.5, upper_bound: float = 4.5):
+    """
+    Setup a new SoakTest
+
+    :param dump_path: Flight recorder dump to replay
+    :type dump_path: str
+    :param player: Player name to farm for
+    :type player: str
+    :param hours: Simulated run time
+    :type hours: float
+    :param lower_bound: Minimum simulated delay between cycles (s)
+    :type lower_bound: float
+    :param upper_bound: Maximum simulated delay between cycles (s)
+    :type upper_bound: float
+    """
+
+    self.hours = hours
+    self.lower_bound = lower_bound
+    self.upper_bound = upper_bound
+
+    self.clicker = _CountingClicker()
+    self.scratch_dir = tempfile.mkdtemp(prefix="soak_")
+    self.events = EventBus()
+    self.store = SessionStore(os.path.join(self.scratch_dir, "session.db"))
+    recorder = FlightRecorder(os.path.join(self.scratch_dir, "flight_records"))
+    self.engine = FarmEngine(ReplayCapture(dump_path), 1, self.clicker, recorder, self.events, store=self.store)
+    self.engine.rules = RuleSet([FarmRule(player)])
+
+
+  # ================ Public Functions ================
+
+  def run(self, warmup_fraction: float = 0.1, samples: int = 50, rss_tolerance_mb: float = 16.0, heap_tolerance_mb: float = 4.0) -> bool:
+    """
+    Run the soak test
+
+    :param warmup_fraction: Fraction of the run to ignore while caches and buffers settle
+    :type warmup_fraction: float
+    :param samples: Number of memory samples to take over the run
+    :type samples: int
+    :param rss_tolerance_mb: Allowed RSS growth after warm-up
+    :type rss_tolerance_mb: float
+    :param heap_tolerance_mb: Allowed growth of the per-window tracemalloc peak after warm-up
+    :type heap_tolerance_mb: float
+    :return: True if memory stayed flat
+    :rtype: bool
+    """
+
+    # Number of cycles in the simulated period, time itself is not waited for
+    mean_interval = (self.lower_bound + self.upper_bound) / 2
+    total_cycles = max(samples, int(self.hours * 3600 / mean_interval))
+    warmup_cycles = max(1, int(total_cycles * warmup_fraction))
+    sample_every = max(1, (total_cycles - warmup_cycles) // samples)
+    Logger.log(SoakTest._LOG_HEADER, f"Running {total_cycles} cycles (~{self.hours:.1f}h simulated)")
+
+    process = psutil.Process()
+    tracemalloc.start()
+
+    # Peaks include each cycle's short-lived OCR buffers, so the baseline is itself
+    # a peak over the last window of warm-up, and every later window is compared against it
+    baseline_start = max(0, warmup_cycles - sample_every)
+    baseline_rss = baseline_heap = None
+    max_rss = max_heap = 0
+    simulated = 0.0
+    for cycle in range(total_cycles):
+      if cycle == baseline_start: tracemalloc.reset_peak()
+
+      # One cycle as FarmEngine.run() does it, and the UI side draining the bus
+      start = time.time()
+      clicked = self.engine.runCycle()
+      end = time.time()
+      self.engine.reportCycle(clicked, end - start, False, end, 0.0)
+      self.events.drain()
+      simulated += random.uniform(self.lower_bound, self.upper_bound)
+
+      if cycle == warmup_cycles - 1:
+        baseline_rss = process.memory_info().rss
+        baseline_heap = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+      elif cycle >= warmup_cycles and (cycle - warmup_cycles + 1) % sample_every == 0:
+        max_rss = max(max_rss, process.memory_info().rss)
+        max_heap = max(max_heap, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        Logger.log(SoakTest._LOG_HEADER, f"{simulated / 3600:.1f}h | RSS={max_rss / SoakTest._MB:.1f}MB | Heap peak={max_heap / SoakTest._MB:.2f}MB | Clicks={self.clicker.clicks}")
+
+    tracemalloc.stop()
+    self.store.close()
+    shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    rss_growth = max(0, max_rss - baseline_rss) / SoakTest._MB
+    heap_growth = max(0, max_heap - baseline_heap) / SoakTest._MB
+    passed = rss_growth <= rss_tolerance_mb and heap_growth <= heap_tolerance_mb
+    Logger.log(SoakTest._LOG_HEADER, f"{'PASSED' if passed else 'FAILED'} | RSS growth={rss_growth:.2f}MB (max {rss_tolerance_mb}) | Heap peak growth={heap_growth:.2f}MB (max {heap_tolerance_mb})")
+    return passed
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Replay recorded frames through the farm loop and check memory stays flat.")
+  parser.add_argument("dump", help="Flight recorder dump directory")
+  parser.add_argument("--player", required=True, help="Player name to farm for")
+  parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours to run")
+  args = parser.parse_args()
+
+  Logger.init("logs", True, True)
+  ElementDetector.init()
+  sys.exit(0 if SoakTest(args.dump, args.player, args.hours).run() else 1)
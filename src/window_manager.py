@@ -118,12 +118,13 @@ class WindowManager:
     return proc.exe() # Full path to the exe
   
 
-  def getWindowTextureFromHwnd(self, hwnd: int):
+  def getWindowTextureFromHwnd(self, hwnd: int, out=None):
     """
     Gets the window texture for a given hwnd
     
     :param hwnd: Window handle
     :type hwnd: int
+    :param out: Preallocated BGR buffer to write into, reused when the window size matches
     :return: cv2 image
     """
 
@@ -150,7 +151,12 @@ class WindowManager:
     bmpstr = bitmap.GetBitmapBits(True)
     img = np.frombuffer(bmpstr, dtype=np.uint8)
     img.shape = (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4)  # BGRA
-    img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)  # convert to BGR for OpenCV
+
+    # Convert to BGR for OpenCV, into the caller's buffer if it still fits
+    if out is not None and out.shape == (img.shape[0], img.shape[1], 3):
+      img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR, dst=out)
+    else:
+      img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
     # Cleanup properly
     save_dc.SelectObject(old_bitmap)          # Deselect bitmap before deleting DC
@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.farm_rules import FarmRule, RuleSet
+
+
+def _evaluate(rules: RuleSet, lines: list[tuple[str, tuple]]):
+  texts = [text for text, _ in lines]
+  boxes = np.array([box for _, box in lines], dtype=np.int32)
+  return rules.evaluate(texts, boxes, len(lines), now=1000.0)
+
+
+def test_button_of_newer_embed_is_not_paired_with_older_name():
+  # alice's embed above bob's, both with a farm button
+  lines = [
+    ("alice used /farm", (60, 10, 260, 30)),
+    ("alice", (100, 40, 160, 60)),
+    ("farm", (100, 120, 160, 140)),
+    ("bob used /farm", (60, 210, 260, 230)),
+    ("bob", (100, 240, 160, 260)),
+    ("farm", (100, 320, 160, 340)),
+  ]
+
+  matches, player_seen = _evaluate(RuleSet([FarmRule("alice")]), lines)
+
+  assert player_seen
+  assert [(rule.player, btn_box, name_box) for rule, btn_box, name_box in matches] == [
+    ("alice", (100, 120, 160, 140), (100, 40, 160, 60)),
+  ]
+
+
+def test_buttons_in_the_same_embed_match_their_own_rules():
+  lines = [
+    ("alice used /farm", (60, 10, 260, 30)),
+    ("alice", (100, 40, 160, 60)),
+    ("storage full", (100, 70, 220, 90)),
+    ("farm", (100, 120, 160, 140)),
+    ("sell", (100, 160, 160, 180)),
+  ]
+  rules = RuleSet([FarmRule("alice"), FarmRule("alice", button="sell", text="full")])
+
+  matches, _ = _evaluate(rules, lines)
+
+  assert sorted(rule.button for rule, _, _ in matches) == ["farm", "sell"]
+
+
+def test_template_hits_away_from_the_last_button_are_not_clicked():
+  rule = FarmRule("alice")
+  rules = RuleSet([rule])
+  anchors = {rule.key(): ((100, 40, 160, 60), (100, 120, 160, 140))}
+
+  # Same column, but further down: another player's newer embed
+  hits = [((100, 320, 160, 340), "farm", 0.95)]
+  assert rules.evaluateButtons(hits, anchors, now=1000.0) == []
+
+  hits.append(((102, 122, 162, 142), "farm", 0.9))
+  assert rules.evaluateButtons(hits, anchors, now=1000.0) == [(rule, (102, 122, 162, 142), (100, 40, 160, 60))]
+
+
+def test_command_header_alone_does_not_count_as_player_seen():
+  lines = [("alice used /farm", (60, 10, 260, 30))]
+
+  matches, player_seen = _evaluate(RuleSet([FarmRule("alice")]), lines)
+
+  assert matches == [] and not player_seen